@@ -2,27 +2,138 @@
 Production REST API for AI-Generated Voice Detection
 Deployment-ready with environment variable configuration
 """
-from fastapi import FastAPI, HTTPException, Depends, status, Header
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Request, WebSocket, status, Header
+from fastapi.responses import PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from typing import List, Optional
+import asyncio
 import base64
+import functools
+import io
 import os
+import signal
 import tempfile
-import librosa
 import soundfile as sf
+import soxr
 import uvicorn
 import numpy as np
 
-from src.feature_engineering import FeatureExtractor
 from src.anomaly_detection import AnomalyScorer
-from src.decision_engine import DecisionEngine
+from src.feature_engineering import (
+    DECODE_ERRORS, AudioTooLong, ClipAnalysis, FeatureExtractor, decode_audio, decode_audio_stream, flatten_features
+)
+from src.audit_log import get_audit_logger
+from src.inference_pool import InferencePool, PoolSaturated
+from src.metrics import Metrics, merge_timings, request_timings, server_timing_header, span
+from src.model_registry import ModelRegistry
+from src.result_cache import ResultCache
+from src.signal_quality import estimate_snr, voiced_ratio
+from src.live_scoring import LiveSession, advance_session
 
 # API Configuration from environment
 API_KEY = os.getenv("API_KEY", "HCL_AI_VOICE_DETECTION_2026")
 
+# Inference pool configuration
+DETECT_EXECUTOR = os.getenv("DETECT_EXECUTOR", "thread")  # "thread" or "process"
+DETECT_WORKERS = int(os.getenv("DETECT_WORKERS", 0)) or None  # 0 = one per CPU core
+DETECT_QUEUE_SIZE = int(os.getenv("DETECT_QUEUE_SIZE", 8))
+DETECT_RETRY_AFTER = int(os.getenv("DETECT_RETRY_AFTER", 2))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 64))
+
+# Streaming upload limits
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 50 * 1024 * 1024))
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", 1024 * 1024))  # In-memory buffer before spilling to disk
+MAX_AUDIO_SECONDS = float(os.getenv("MAX_AUDIO_SECONDS", 600))
+
+# Live (WebSocket) scoring: a verdict every hop over the trailing window
+LIVE_WINDOW_SECONDS = float(os.getenv("LIVE_WINDOW_SECONDS", 10))
+LIVE_HOP_SECONDS = float(os.getenv("LIVE_HOP_SECONDS", 2))
+LIVE_MAX_WINDOW_SECONDS = float(os.getenv("LIVE_MAX_WINDOW_SECONDS", 60))
+
+# Triage: answer clips whose SNR/duration reliability is too low for a
+# confident verdict without running feature extraction (off until calibrated:
+# see DecisionEngine.triage)
+TRIAGE = os.getenv("TRIAGE", "0") == "1"
+
+# Analysis budget: features of longer clips come from at most this many
+# seconds of selected active, high-energy segments (0 analyzes everything).
+# Opt-in: budgeted prosodic and energy features drift from the whole-clip
+# values the profile was calibrated on (see src/analysis_budget_eval.py)
+ANALYSIS_BUDGET_SECONDS = float(os.getenv("ANALYSIS_BUDGET_SECONDS", 0))
+if ANALYSIS_BUDGET_SECONDS > 0:
+    print(f"Warning: ANALYSIS_BUDGET_SECONDS={ANALYSIS_BUDGET_SECONDS:g} scores long clips on partial audio; "
+          "jitter, F0 and energy entropy shift from the calibrated whole-clip values")
+
+# Startup: run a synthetic clip through the pipeline (in every process-pool
+# worker) so numba JIT compilation happens before the first real request
+WARMUP = os.getenv("WARMUP", "1") == "1"
+startup = {"ready": False, "import_seconds": None, "warmup_seconds": None, "ready_after_seconds": None, "warmup_error": None}
+warmup_task = None
+
+def _warm_up_worker():
+    """Process-pool initializer"""
+    if WARMUP:
+        warm_up_pipeline()
+
+pool = InferencePool(
+    workers=DETECT_WORKERS,
+    queue_size=DETECT_QUEUE_SIZE,
+    mode=DETECT_EXECUTOR,
+    retry_after=DETECT_RETRY_AFTER,
+    initializer=_warm_up_worker if DETECT_EXECUTOR == "process" else None
+)
+
+async def warm_up():
+    started = time.perf_counter()
+    try:
+        if WARMUP:
+            if pool.mode == "process":
+                await pool.start_workers()
+            else:
+                await run_in_threadpool(warm_up_pipeline)
+    except Exception as e:
+        startup["warmup_error"] = f"{type(e).__name__}: {e}"
+        print(f"Warm-up failed, serving cold: {e}")
+    finally:
+        startup["warmup_seconds"] = round(time.perf_counter() - started, 3)
+        startup["ready_after_seconds"] = round(time.perf_counter() - _IMPORT_STARTED, 3)
+        startup["ready"] = True
+
+async def wait_until_ready():
+    """Hold early requests until warm-up is done instead of letting them pay for JIT compilation"""
+    if warmup_task is not None and not warmup_task.done():
+        await asyncio.shield(warmup_task)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global warmup_task, audit_log
+    if AUDIT_LOG_PATH:
+        audit_log = open_audit_log()
+    # Warm up in the background so the server answers liveness immediately
+    warmup_task = asyncio.create_task(warm_up())
+    loop = asyncio.get_running_loop()
+    watcher = asyncio.create_task(registry.watch(MODEL_RELOAD_INTERVAL)) if MODEL_RELOAD_INTERVAL > 0 else None
+    try:
+        # SIGHUP forces a reload (not available on Windows)
+        loop.add_signal_handler(signal.SIGHUP, lambda: loop.run_in_executor(None, reload_model))
+    except (AttributeError, NotImplementedError, RuntimeError):
+        pass
+    yield
+    warmup_task.cancel()
+    if watcher is not None:
+        watcher.cancel()
+    pool.shutdown(wait=False)
+
 app = FastAPI(
     title="AI-Generated Voice Detection API",
     description="Official Endpoint Tester Compatible - Forensic detection using statistical human speech profiling",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Initialize components with absolute paths
@@ -30,9 +141,90 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PROFILE_PATH = os.path.join(BASE_DIR, "reports", "human_feature_profile.json")
 THRESHOLD_PATH = os.path.join(BASE_DIR, "reports", "human_anomaly_thresholds.json")
 
-extractor = FeatureExtractor(sr=16000)
-scorer = AnomalyScorer(PROFILE_PATH)
-engine = DecisionEngine(THRESHOLD_PATH)
+# Pitch tracker: "pyin" (calibrated default) or "yin" (fast path, see src/f0_backend_parity.py)
+F0_BACKEND = os.getenv("F0_BACKEND", "pyin")
+
+# Seconds between checks of the profile/thresholds files (0 disables the watcher)
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", 5))
+
+extractor = FeatureExtractor(sr=16000, f0_backend=F0_BACKEND)
+# Calibrated profile and thresholds; read registry.current once per request
+registry = ModelRegistry(PROFILE_PATH, THRESHOLD_PATH, config_id=extractor.config_id())
+
+def reload_model():
+    """Reload profile and thresholds, keeping the current model on failure"""
+    try:
+        if registry.reload():
+            print(f"Model reloaded: version {registry.current.version}")
+    except Exception as e:
+        print(f"Model reload failed, keeping version {registry.current.version}: {e}")
+
+# Metrics: per-stage latency histograms and counters on /metrics
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"  # per-request Server-Timing header
+metrics = Metrics()
+metrics.describe("requests_total", "counter", "HTTP requests by endpoint and status")
+metrics.describe("errors_total", "counter", "HTTP requests that ended in a 4xx/5xx status")
+metrics.describe("request_duration_seconds", "histogram", "End-to-end HTTP request latency")
+metrics.describe("stage_duration_seconds", "histogram", "Time per pipeline stage and clip")
+metrics.describe("audio_seconds_total", "counter", "Seconds of audio analyzed (cache hits excluded)")
+metrics.describe("live_windows_total", "counter", "Verdicts sent on /ws/detect")
+metrics.describe("early_exits_total", "counter", "Clips answered at triage without feature extraction")
+
+# Audit log of every decision (JSON lines, written off the request path); empty path disables it
+AUDIT_LOG_PATH = os.getenv("AUDIT_LOG_PATH", "")
+AUDIT_LOG_SAMPLE_RATE = float(os.getenv("AUDIT_LOG_SAMPLE_RATE", 1.0))
+AUDIT_LOG_MAX_BYTES = int(os.getenv("AUDIT_LOG_MAX_BYTES", 10 * 1024 * 1024))
+audit_log = None  # opened by lifespan in each server process
+
+def open_audit_log():
+    """
+    Start this process's audit log writer. Workers forked by serve.py each
+    write their own file (<name>.worker<N>.jsonl) so rotation never races.
+    """
+    path = AUDIT_LOG_PATH
+    worker_id = os.getenv("SERVE_WORKER_ID")
+    if worker_id is not None:
+        root, ext = os.path.splitext(path)
+        path = f"{root}.worker{worker_id}{ext}"
+    return get_audit_logger(path, sample_rate=AUDIT_LOG_SAMPLE_RATE, max_bytes=AUDIT_LOG_MAX_BYTES)
+
+# Result cache for re-submitted clips (0 entries disables it)
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", 4096))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", 3600))
+result_cache = ResultCache(max_entries=RESULT_CACHE_SIZE, ttl_seconds=RESULT_CACHE_TTL)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    timings = {}
+    request_timings.set(timings)
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+
+    route = request.scope.get("route")
+    endpoint = route.path if route is not None else "unmatched"
+    metrics.inc("requests_total", endpoint=endpoint, status=response.status_code)
+    if response.status_code >= 400:
+        metrics.inc("errors_total", endpoint=endpoint, status=response.status_code)
+    metrics.observe("request_duration_seconds", elapsed, endpoint=endpoint)
+    if SERVER_TIMING and timings:
+        response.headers["Server-Timing"] = server_timing_header({**timings, "total": elapsed})
+    return response
+
+def record_clip(clip: dict, timings: Optional[dict] = None):
+    """Account an analyzed clip's stage timings and audio duration"""
+    clip_timings = clip.get('timings', {})
+    metrics.observe_stages(clip_timings)
+    metrics.inc("audio_seconds_total", clip['duration'])
+    merge_timings(timings, clip_timings)
+
+class AudioRejected(Exception):
+    """Raised by the pipeline for client-side audio problems (mapped to 400)"""
+
+    @classmethod
+    def undecodable(cls, error):
+        """Rejection for a file the decoders raised DECODE_ERRORS on"""
+        return cls(f"Unsupported or corrupt audio ({type(error).__name__})")
 
 # Request/Response Models
 class DetectionRequest(BaseModel):
@@ -44,6 +236,20 @@ class DetectionResponse(BaseModel):
     classification: str  # "HUMAN" or "AI_GENERATED"
     confidence: float    # 0.0 to 1.0
 
+class BatchDetectionRequest(BaseModel):
+    clips: List[DetectionRequest]
+
+class BatchItemResult(BaseModel):
+    index: int  # Position of the clip in the request
+    classification: Optional[str] = None
+    confidence: Optional[float] = None
+    error: Optional[str] = None  # Set instead of classification when the clip failed
+
+class BatchDetectionResponse(BaseModel):
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+
 def map_to_minimal_response(decision: dict) -> dict:
     """Map internal decision to minimal public response"""
     internal_result = decision['result']
@@ -73,8 +279,159 @@ async def verify_api_key(x_api_key: str = Header(None)):
 # Health Check
 @app.get("/health")
 async def health_check():
-    """Health check endpoint for deployment verification"""
-    return {"status": "ok"}
+    """Liveness (ok as soon as the server is up), with readiness and startup timing"""
+    return {"status": "ok", "ready": startup["ready"], "startup": startup}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: 503 until the pipeline has been warmed up"""
+    if not startup["ready"]:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Warming up",
+            headers={"Retry-After": str(DETECT_RETRY_AFTER)}
+        )
+    return {"status": "ready", "startup": startup}
+
+# Detection Pipeline
+# Decode + feature extraction runs on the inference pool, never on the event loop;
+# scoring is vectorized and cheap, so it runs for whole batches at once.
+def triage_settings(model) -> Optional[tuple]:
+    """
+    (model version, min_reliability) for analyze_waveform's triage, or None
+    when triage is off. Taken from the request's snapshot in the parent: a
+    process-pool worker's own registry is not reloaded with the parent's.
+    """
+    return (model.version, model.engine.min_reliability) if TRIAGE else None
+
+def analyze_clip(audio_bytes: bytes, triage: Optional[tuple] = None) -> dict:
+    """Decode and extract features for a single clip"""
+    timings = {}
+    # Decode in memory (single decode, no temp files)
+    try:
+        with span(timings, "decode"):
+            y, sr = decode_audio(audio_bytes, sr=16000)
+    except DECODE_ERRORS as e:
+        raise AudioRejected.undecodable(e)
+    return analyze_waveform(y, sr, timings, triage)
+
+def analyze_upload(source, triage: Optional[tuple] = None) -> dict:
+    """
+    Block-wise decode of an uploaded file (file object or bytes) and analysis,
+    as one pool job; the decoded clip is bounded by MAX_AUDIO_SECONDS
+    """
+    timings = {}
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    try:
+        with span(timings, "decode"):
+            y, sr = decode_audio_stream(source, 16000, MAX_AUDIO_SECONDS)
+    except AudioTooLong:
+        raise
+    except (*DECODE_ERRORS, ValueError) as e:
+        raise AudioRejected.undecodable(e)
+    return analyze_waveform(y, sr, timings, triage)
+
+def analyze_waveform(y: np.ndarray, sr: int, timings: Optional[dict] = None, triage: Optional[tuple] = None) -> dict:
+    """
+    Extract features and signal statistics from a decoded clip.
+    Per-stage seconds are returned under "timings" (they travel back from
+    process-pool workers with the result). With `triage` (see
+    triage_settings) clips below min_reliability skip feature extraction.
+    """
+    timings = {} if timings is None else timings
+    duration = len(y) / sr
+
+    if duration < 0.3:
+        raise AudioRejected("Audio too short (minimum 0.3 seconds required)")
+
+    # Triage on frame RMS (cached in the analysis and reused by the extractors)
+    analysis = ClipAnalysis(y, sr)
+    with span(timings, "triage"):
+        snr = estimate_snr(analysis.frame_energy)
+        activity = voiced_ratio(analysis.frame_energy)
+        reliability = float(AnomalyScorer.reliability(snr, duration))
+    clip = {"snr": snr, "duration": duration, "voiced_ratio": activity, "timings": timings}
+    if triage is not None:
+        model_version, min_reliability = triage
+        if reliability < min_reliability:
+            return {**clip, "features": {}, "triaged": True, "reliability": reliability, "model_version": model_version}
+
+    # Extract features
+    if ANALYSIS_BUDGET_SECONDS > 0:
+        features = extractor.extract_budgeted(y, sr, ANALYSIS_BUDGET_SECONDS, analysis=analysis, timings=timings)
+    else:
+        features = extractor.extract_from_array(y, sr, analysis, timings)
+    if not features:
+        raise AudioRejected("Failed to extract features from audio")
+
+    # Flatten features
+    return {**clip, "features": flatten_features(features)}
+
+def warm_up_pipeline():
+    """
+    Run a synthetic clip through decode, resampling, one-shot and streaming
+    feature extraction so every numba kernel is compiled in this process.
+    """
+    sr = 22050  # not 16 kHz, so the resampler is exercised as well
+    t = np.arange(sr) / sr
+    y = 0.3 * np.sin(2 * np.pi * 150 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    y = (y + 0.01 * np.random.default_rng(0).standard_normal(sr)).astype(np.float32)
+    buffer = io.BytesIO()
+    sf.write(buffer, y, sr, format='WAV')
+    analyze_clip(buffer.getvalue())
+    LiveSession(extractor, window_seconds=1.0, hop_seconds=1.0).advance(y[:extractor.sr])
+
+def score_clips(clips: list, model=None) -> list:
+    """Score and decide for analyzed clips in one vectorized pass"""
+    model = model or registry.current
+    scorer, engine = model.scorer, model.engine
+    timings = {}
+    matrix = np.stack([scorer.vectorize(clip['features']) for clip in clips])
+    snr = np.array([clip['snr'] for clip in clips])
+    duration = np.array([clip['duration'] for clip in clips])
+
+    # Compute anomaly scores
+    with span(timings, "scoring"):
+        anomaly_scores, reliabilities, categories = scorer.score_batch(matrix, snr=snr, duration=duration, return_categories=True)
+
+    responses = []
+    with span(timings, "decision"):
+        # Make decisions (no explanations: the public response never shows them)
+        decisions = engine.decide_batch(anomaly_scores, reliabilities, categories)
+        for i, clip in enumerate(clips):
+            if clip.get('triaged'):
+                decision = engine.triage(clip['reliability'])
+                metrics.inc("early_exits_total")
+            else:
+                decision = {
+                    "result": str(decisions['result'][i]),
+                    "confidence": float(decisions['confidence'][i]),
+                    "risk_level": str(decisions['risk_level'][i]),
+                    "anomaly_score": float(anomaly_scores[i]),
+                    "reliability": float(reliabilities[i])
+                }
+            if audit_log is not None:
+                audit_log.info("decision", extra={"audit": {
+                    "model_version": clip.get('model_version', model.version),
+                    "result": decision['result'],
+                    "confidence": round(decision['confidence'], 4),
+                    "risk_level": decision['risk_level'],
+                    "anomaly_score": round(decision['anomaly_score'], 4) if 'anomaly_score' in decision else None,
+                    "reliability": round(decision['reliability'], 4),
+                    "snr": round(float(snr[i]), 2),
+                    "duration": round(float(duration[i]), 3),
+                    "voiced_ratio": round(clip['voiced_ratio'], 3) if 'voiced_ratio' in clip else None,
+                    "triaged": bool(clip.get('triaged'))
+                }})
+
+            # Map to minimal response
+            responses.append(map_to_minimal_response(decision))
+
+    metrics.observe("stage_duration_seconds", timings["scoring"], stage="scoring")
+    metrics.observe("stage_duration_seconds", timings["decision"], stage="decision")
+    merge_timings(request_timings.get(), timings)
+    return responses
 
 # Main Detection Endpoint
 @app.post("/detect", response_model=DetectionResponse)
@@ -87,106 +444,328 @@ async def detect_ai_voice(
     
     Official Endpoint Tester Compatible
     """
+    await wait_until_ready()
+    timings = request_timings.get()
     try:
         # Decode base64 audio
-        audio_bytes = base64.b64decode(request.audio_base64_format)
-        
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
-            tmp_path = tmp_file.name
-            tmp_file.write(audio_bytes)
-        
-        try:
-            # Load and preprocess audio
-            y, sr = librosa.load(tmp_path, sr=16000)
-            duration = len(y) / sr
-            
-            if duration < 0.3:
+        with span(timings, "base64"):
+            audio_bytes = base64.b64decode(request.audio_base64_format)
+    except base64.binascii.Error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid base64 encoding"
+        )
+
+    model = registry.current
+    cache_key = ResultCache.key_for(audio_bytes, model.version)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        return DetectionResponse(**cached["response"])
+
+    try:
+        clip = await pool.run(analyze_clip, audio_bytes, triage_settings(model))
+        record_clip(clip, timings)
+        public_response = score_clips([clip], model)[0]
+        result_cache.put(cache_key, model.scorer.vectorize(clip['features']), public_response)
+    except PoolSaturated as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except AudioRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Processing error: {str(e)}"
+        )
+
+    return DetectionResponse(**public_response)
+
+# Streaming Upload Endpoint
+@app.post("/detect/stream", response_model=DetectionResponse)
+async def detect_ai_voice_stream(
+    request: Request,
+    x_api_key: str = Depends(verify_api_key)
+):
+    """
+    Detect AI-generated speech from a raw audio request body (WAV/FLAC/OGG/MP3).
+
+    The body is streamed into a spooled buffer (spilling to disk past
+    UPLOAD_SPOOL_BYTES) and decoded block by block, so no base64 copy or
+    JSON string is ever held in memory. The pool slot is taken before the
+    body is read and held until scoring ends, and decoding runs in the pool
+    job, so concurrent uploads stay within the pool's admission bound.
+    """
+    await wait_until_ready()
+    try:
+        reservation = pool.reserve()
+    except PoolSaturated as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    with reservation:
+        content_length = request.headers.get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Upload too large (maximum {MAX_UPLOAD_BYTES} bytes)"
+            )
+
+        timings = request_timings.get()
+        with tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES) as spool:
+            received = 0
+            upload_started = time.perf_counter()
+            hasher = ResultCache.hasher()
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Upload too large (maximum {MAX_UPLOAD_BYTES} bytes)"
+                    )
+                hasher.update(chunk)
+                await run_in_threadpool(spool.write, chunk)
+            spool.seek(0)
+            timings["upload"] = time.perf_counter() - upload_started
+
+            model = registry.current
+            cache_key = ResultCache.make_key(hasher.hexdigest(), model.version)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                return DetectionResponse(**cached["response"])
+
+            # Thread workers read the spool directly; process workers get its bytes
+            source = spool if pool.mode == "thread" else await run_in_threadpool(spool.read)
+            try:
+                clip = await reservation.run(analyze_upload, source, triage_settings(model))
+                record_clip(clip, timings)
+                public_response = score_clips([clip], model)[0]
+                result_cache.put(cache_key, model.scorer.vectorize(clip['features']), public_response)
+            except AudioTooLong as e:
                 raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Audio too short (minimum 0.3 seconds required)"
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=str(e)
                 )
-            
-            # Save as WAV for feature extraction
-            wav_path = tmp_path.replace('.mp3', '_processed.wav')
-            sf.write(wav_path, y, 16000)
-            
-            # Extract features
-            features = extractor.extract_all(wav_path)
-            if not features:
+            except AudioRejected as e:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Failed to extract features from audio"
+                    detail=str(e)
                 )
-            
-            # Flatten features
-            flat_features = {}
-            for k, v in features.items():
-                if isinstance(v, list):
-                    for i, val in enumerate(v):
-                        flat_features[f"{k}_{i}"] = val
-                else:
-                    flat_features[k] = v
-            
-            # Estimate SNR
-            rms = librosa.feature.rms(y=y)[0]
-            signal_power = np.mean(rms**2)
-            noise_power = np.min(rms**2)
-            snr = 10 * np.log10(signal_power / (noise_power + 1e-10)) if noise_power > 0 else 50
-            
-            # Compute anomaly score
-            anomaly_score, reliability = scorer.score(flat_features, snr=snr, duration=duration)
-            
-            # Get feature scores
-            feature_scores = scorer.calculate_raw_scores(flat_features)
-            
-            # Make decision
-            decision = engine.decide(anomaly_score, reliability, feature_scores)
-            
-            # Map to minimal response
-            public_response = map_to_minimal_response(decision)
-            
-            # Cleanup
-            os.remove(tmp_path)
-            if os.path.exists(wav_path):
-                os.remove(wav_path)
-            
-            return DetectionResponse(**public_response)
-            
-        except HTTPException:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-            raise
-        except Exception as e:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Processing error: {str(e)}"
-            )
-            
-    except base64.binascii.Error:
+            except Exception as e:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Processing error: {str(e)}"
+                )
+
+    return DetectionResponse(**public_response)
+
+# Batch Detection Endpoint
+@app.post("/detect/batch", response_model=BatchDetectionResponse)
+async def detect_ai_voice_batch(
+    request: BatchDetectionRequest,
+    x_api_key: str = Depends(verify_api_key)
+):
+    """
+    Detect AI-generated speech for many clips in one request.
+
+    Clips are analyzed in parallel on the worker pool and scored together.
+    A failing clip is reported in its own result without failing the batch.
+    """
+    await wait_until_ready()
+    if not request.clips:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid base64 encoding"
+            detail="Batch must contain at least one clip"
+        )
+    if len(request.clips) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch too large (maximum {MAX_BATCH_SIZE} clips)"
         )
 
+    model = registry.current
+    timings = request_timings.get()
+    results = [None] * len(request.clips)
+    pending = []
+    for index, item in enumerate(request.clips):
+        try:
+            with span(timings, "base64"):
+                audio_bytes = base64.b64decode(item.audio_base64_format)
+        except base64.binascii.Error:
+            results[index] = BatchItemResult(index=index, error="Invalid base64 encoding")
+            continue
+        cache_key = ResultCache.key_for(audio_bytes, model.version)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            results[index] = BatchItemResult(index=index, **cached["response"])
+        else:
+            pending.append((index, cache_key, audio_bytes))
+
+    if pending:
+        try:
+            job = functools.partial(analyze_clip, triage=triage_settings(model))
+            outcomes = await pool.map(job, [audio_bytes for _, _, audio_bytes in pending])
+        except PoolSaturated as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, retry later",
+                headers={"Retry-After": str(e.retry_after)}
+            )
+
+        analyzed = []
+        for (index, cache_key, _), outcome in zip(pending, outcomes):
+            if isinstance(outcome, AudioRejected):
+                results[index] = BatchItemResult(index=index, error=str(outcome))
+            elif isinstance(outcome, Exception):
+                results[index] = BatchItemResult(index=index, error=f"Processing error: {str(outcome)}")
+            else:
+                record_clip(outcome, timings)
+                analyzed.append((index, cache_key, outcome))
+
+        if analyzed:
+            responses = score_clips([clip for _, _, clip in analyzed], model)
+            for (index, cache_key, clip), public_response in zip(analyzed, responses):
+                result_cache.put(cache_key, model.scorer.vectorize(clip['features']), public_response)
+                results[index] = BatchItemResult(index=index, **public_response)
+
+    failed = sum(1 for result in results if result.error is not None)
+    return BatchDetectionResponse(
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed
+    )
+
+# Live Detection (WebSocket)
+@app.websocket("/ws/detect")
+async def detect_ai_voice_live(websocket: WebSocket):
+    """
+    Rolling detection over live PCM audio.
+
+    Query parameters: sample_rate (default 16000), encoding ("pcm_s16le" or
+    "f32le", mono), window and hop in seconds. The API key is taken from the
+    x-api-key header or the api_key query parameter.
+
+    Binary messages carry PCM audio of any length; every `hop` seconds of
+    audio the server sends {"type": "verdict", ...} for the trailing `window`
+    seconds. When no worker is free it sends {"type": "busy", ...}, with the
+    seconds of backlog dropped if the queue grew past one window. The text
+    message "end" (or a disconnect) ends the session.
+    """
+    params = websocket.query_params
+    x_api_key = websocket.headers.get("x-api-key") or params.get("api_key")
+    if x_api_key is None or x_api_key != API_KEY:
+        await websocket.close(code=1008)
+        return
+
+    try:
+        sample_rate = int(params.get("sample_rate", 16000))
+        encoding = params.get("encoding", "pcm_s16le")
+        window_seconds = float(params.get("window", LIVE_WINDOW_SECONDS))
+        hop_seconds = float(params.get("hop", LIVE_HOP_SECONDS))
+        if sample_rate <= 0 or window_seconds > LIVE_MAX_WINDOW_SECONDS:
+            raise ValueError
+        session = LiveSession(extractor, window_seconds=window_seconds, hop_seconds=hop_seconds, encoding=encoding)
+    except ValueError:
+        await websocket.close(code=1003)
+        return
+
+    await wait_until_ready()
+    await websocket.accept()
+    resampler = soxr.ResampleStream(sample_rate, extractor.sr, 1, dtype='float32') if sample_rate != extractor.sr else None
+
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        if message.get("text") == "end":
+            break
+        if not message.get("bytes"):
+            continue
+
+        samples = session.decode(message["bytes"])
+        if resampler is not None:
+            samples = resampler.resample_chunk(samples)
+        session.feed(samples)
+
+        while (hop := session.pop_hop()) is not None:
+            started = time.perf_counter()
+            try:
+                session, clip = await pool.run(advance_session, session, hop)
+            except PoolSaturated as e:
+                # Keep the audio queued and retry when the next frames arrive
+                dropped = session.unpop_hop(hop)
+                await websocket.send_json({
+                    "type": "busy",
+                    "retry_after": e.retry_after,
+                    "dropped_seconds": round(dropped / extractor.sr, 3)
+                })
+                break
+            if clip is None:
+                continue
+            verdict = score_clips([clip])[0]
+            metrics.inc("audio_seconds_total", len(hop) / extractor.sr)
+            metrics.inc("live_windows_total")
+            metrics.observe("stage_duration_seconds", time.perf_counter() - started, stage="live_window")
+            await websocket.send_json({
+                "type": "verdict",
+                "window_start": round(session.window_start, 3),
+                "window_end": round(session.window_end, 3),
+                **verdict,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+            })
+
+    await websocket.close()
+
 # Info endpoint (optional, for debugging)
 @app.get("/info")
 async def system_info(x_api_key: str = Depends(verify_api_key)):
     """System information"""
-    import json
-    
-    with open(THRESHOLD_PATH, 'r') as f:
-        thresholds = json.load(f)
-    
     return {
         "system": "AI-Generated Voice Detection",
         "version": "1.0.0",
         "endpoint_tester_compatible": True,
-        "threshold": thresholds['recommended_threshold']
+        **registry.info(),
+        "result_cache": result_cache.stats()
     }
 
+# Prometheus metrics
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Latency histograms and counters in the Prometheus text format"""
+    cache = result_cache.stats()
+    pool_stats = pool.stats()
+    return metrics.render(gauges=[
+        ("cache_hits_total", "counter", "Result cache hits", cache["hits"]),
+        ("cache_misses_total", "counter", "Result cache misses", cache["misses"]),
+        ("cache_entries", "gauge", "Results currently cached", cache["entries"]),
+        ("pool_in_flight", "gauge", "Jobs admitted to the inference pool", pool_stats["in_flight"]),
+        ("pool_rejected_total", "counter", "Jobs rejected with 503 by the inference pool", pool_stats["rejected"]),
+        ("model_reloads_total", "counter", "Successful model reloads", registry.reloads)
+    ])
+
+# Model reload endpoint (recalibration without a restart)
+@app.post("/admin/reload")
+async def reload_model_endpoint(x_api_key: str = Depends(verify_api_key)):
+    """Reload profile and thresholds from disk and swap them in atomically"""
+    try:
+        changed = await run_in_threadpool(registry.reload)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Reload failed, previous model kept: {str(e)}"
+        )
+    return {"reloaded": changed, **registry.info()}
+
+startup["import_seconds"] = round(time.perf_counter() - _IMPORT_STARTED, 3)
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port)
@@ -0,0 +1,273 @@
+"""
+Benchmark harness for the detection pipeline.
+
+Generates seeded synthetic speech-like clips, times every pipeline stage and
+the full FastAPI app (in-process, at several concurrency levels), and saves
+p50/p95/p99 latencies and peak RSS as JSON so runs can be compared across
+commits:
+
+    python benchmark.py                       # full run
+    python benchmark.py --quick               # 1s/5s clips only
+    python benchmark.py --compare reports/benchmarks/<older>.json
+"""
+import argparse
+import asyncio
+import base64
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import lfilter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SR = 16000
+DEFAULT_DURATIONS = (1, 5, 30, 300)
+DEFAULT_CONCURRENCY = (1, 4, 16)
+
+# Synthetic speech: jittered glottal pulse train through three formant
+# resonators, with a syllable-rate envelope, pauses and background noise
+FORMANTS_HZ = ((700, 130), (1220, 70), (2600, 160))
+
+def synthetic_speech(duration, sr=SR, seed=0):
+    rng = np.random.default_rng(seed)
+    n = int(duration * sr)
+    t = np.arange(n) / sr
+
+    # F0 contour: slow intonation drift plus vibrato and cycle-to-cycle jitter
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.3 * t + rng.uniform(0, 2 * np.pi)) + 3 * np.sin(2 * np.pi * 5 * t)
+    f0 *= 1 + 0.01 * rng.standard_normal(n)
+    phase = np.cumsum(f0) / sr
+    source = np.diff(np.floor(phase), prepend=0.0)  # one impulse per glottal cycle
+
+    signal = source
+    for freq, bandwidth in FORMANTS_HZ:
+        r = np.exp(-np.pi * bandwidth / sr)
+        theta = 2 * np.pi * freq / sr
+        signal = lfilter([1 - r], [1, -2 * r * np.cos(theta), r * r], signal)
+
+    # ~4 syllables per second, with a pause roughly every 2 seconds
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t + rng.uniform(0, 2 * np.pi)), 0, None) ** 0.5
+    envelope *= (np.sin(2 * np.pi * 0.5 * t) > -0.8)
+    signal = signal * envelope
+    signal = signal / (np.max(np.abs(signal)) + 1e-9) * 0.5
+    signal += 0.005 * rng.standard_normal(n)
+    return signal.astype(np.float32)
+
+def wav_bytes(y, sr=SR):
+    buffer = io.BytesIO()
+    sf.write(buffer, y, sr, format='WAV', subtype='PCM_16')
+    return buffer.getvalue()
+
+def summarize(samples):
+    samples = np.asarray(samples, dtype=float)
+    return {
+        "n": int(len(samples)),
+        "mean": float(samples.mean()),
+        "p50": float(np.percentile(samples, 50)),
+        "p95": float(np.percentile(samples, 95)),
+        "p99": float(np.percentile(samples, 99))
+    }
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), text=True).strip()
+    except Exception:
+        return None
+
+def repeats_for(duration):
+    return max(1, min(10, int(60 // duration)))
+
+def bench_stages(api, durations):
+    """Time each stage of the pipeline on clips of every duration"""
+    from src.feature_engineering import ClipAnalysis, decode_audio, flatten_features
+    from src.signal_quality import estimate_snr
+
+    model = api.registry.current
+    results = {}
+    for duration in durations:
+        y = synthetic_speech(duration, seed=duration)
+        payload = wav_bytes(y)
+        stage_samples = {}
+
+        def record(stage, seconds):
+            stage_samples.setdefault(stage, []).append(seconds)
+
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+            tmp.write(payload)
+            wav_path = tmp.name
+        try:
+            for _ in range(repeats_for(duration)):
+                t0 = time.perf_counter()
+                decoded, sr = decode_audio(payload, sr=SR)
+                record("decode", time.perf_counter() - t0)
+
+                timings = {}
+                t0 = time.perf_counter()
+                analysis = ClipAnalysis(decoded, sr)
+                features = api.extractor.extract_from_array(decoded, sr, analysis, timings)
+                record("features", time.perf_counter() - t0)
+                for stage, seconds in timings.items():
+                    record(stage, seconds)
+
+                flat = flatten_features(features)
+                t0 = time.perf_counter()
+                snr = estimate_snr(analysis.frame_energy)
+                record("snr", time.perf_counter() - t0)
+
+                t0 = time.perf_counter()
+                scores, reliabilities, categories = model.scorer.score_batch(
+                    model.scorer.vectorize(flat), snr=snr, duration=duration, return_categories=True
+                )
+                record("scoring", time.perf_counter() - t0)
+
+                t0 = time.perf_counter()
+                model.engine.decide_batch(scores, reliabilities, categories)
+                record("decision", time.perf_counter() - t0)
+
+                t0 = time.perf_counter()
+                api.extractor.extract_all(wav_path)
+                record("extract_all", time.perf_counter() - t0)
+        finally:
+            os.remove(wav_path)
+
+        results[f"{duration}s"] = {stage: summarize(samples) for stage, samples in stage_samples.items()}
+        results[f"{duration}s"]["realtime_factor"] = float(np.median(stage_samples["extract_all"]) / duration)
+        print(f"  {duration:>4}s clip: extract_all p50 {results[f'{duration}s']['extract_all']['p50'] * 1000:.0f} ms "
+              f"({results[f'{duration}s']['realtime_factor']:.3f}x realtime)")
+    return results
+
+async def bench_app(api, duration, concurrency_levels, requests_per_level):
+    """Drive /detect in-process with httpx at each concurrency level"""
+    import httpx
+
+    base = synthetic_speech(duration, seed=1000 + duration)
+    rng = np.random.default_rng(0)
+    headers = {"x-api-key": api.API_KEY}
+    results = {}
+
+    async with api.app.router.lifespan_context(api.app):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for concurrency in concurrency_levels:
+                # Distinct audio per request so the result cache never answers
+                bodies = [
+                    {"language": "en", "audio_format": "wav",
+                     "audio_base64_format": base64.b64encode(wav_bytes(base + 1e-3 * rng.standard_normal(len(base)).astype(np.float32))).decode()}
+                    for _ in range(requests_per_level)
+                ]
+                semaphore = asyncio.Semaphore(concurrency)
+                latencies, statuses = [], []
+
+                async def one(body):
+                    async with semaphore:
+                        t0 = time.perf_counter()
+                        response = await client.post("/detect", json=body, headers=headers)
+                        latencies.append(time.perf_counter() - t0)
+                        statuses.append(response.status_code)
+
+                t0 = time.perf_counter()
+                await asyncio.gather(*(one(body) for body in bodies))
+                wall = time.perf_counter() - t0
+
+                results[str(concurrency)] = {
+                    **summarize(latencies),
+                    "throughput_rps": len(bodies) / wall,
+                    "errors": sum(1 for code in statuses if code != 200),
+                    "rejected_503": sum(1 for code in statuses if code == 503)
+                }
+                print(f"  concurrency {concurrency:>3}: p50 {results[str(concurrency)]['p50'] * 1000:.0f} ms, "
+                      f"p99 {results[str(concurrency)]['p99'] * 1000:.0f} ms, {results[str(concurrency)]['throughput_rps']:.2f} req/s")
+    return results
+
+def compare(current, baseline_path):
+    """Print p50 ratios against an earlier run (>1 means slower now)"""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    print(f"\nAgainst {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    for clip, stages in current["stages"].items():
+        for stage, stats in stages.items():
+            old = baseline.get("stages", {}).get(clip, {}).get(stage)
+            if isinstance(stats, dict) and isinstance(old, dict) and old["p50"] > 0:
+                print(f"  {clip:>5} {stage:<12} p50 {stats['p50'] * 1000:9.2f} ms  x{stats['p50'] / old['p50']:.2f}")
+    for level, stats in current["app"].items():
+        old = baseline.get("app", {}).get(level)
+        if old and old["p50"] > 0:
+            print(f"  /detect c={level:<4} p50 {stats['p50'] * 1000:9.2f} ms  x{stats['p50'] / old['p50']:.2f}  "
+                  f"throughput x{stats['throughput_rps'] / old['throughput_rps']:.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the detection pipeline")
+    parser.add_argument("--durations", type=float, nargs="+", default=DEFAULT_DURATIONS, help="Clip lengths in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY, help="In-flight /detect requests")
+    parser.add_argument("--requests", type=int, default=32, help="/detect requests per concurrency level")
+    parser.add_argument("--app-duration", type=float, default=5, help="Clip length used for /detect")
+    parser.add_argument("--quick", action="store_true", help="Only 1s and 5s clips, 8 requests per level")
+    parser.add_argument("--output", help="Result JSON path (default reports/benchmarks/<timestamp>_<commit>.json)")
+    parser.add_argument("--compare", help="Earlier result JSON to compare against")
+    args = parser.parse_args()
+    if args.quick:
+        args.durations = [d for d in args.durations if d <= 5]
+        args.requests = 8
+    durations = [int(d) if float(d).is_integer() else d for d in args.durations]
+
+    # Every request must run the full pipeline, and none may be shed
+    os.environ.setdefault("RESULT_CACHE_SIZE", "0")
+    os.environ.setdefault("DETECT_QUEUE_SIZE", str(max(args.concurrency) * 2))
+    import api
+
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "f0_backend": api.extractor.f0_backend,
+            "executor": api.pool.mode,
+            "workers": api.pool.workers,
+            "model_version": api.registry.current.version
+        },
+        "rss_mb": {"after_import": peak_rss_mb()}
+    }
+
+    print("Pipeline stages:")
+    result["stages"] = bench_stages(api, durations)
+    result["rss_mb"]["after_stages"] = peak_rss_mb()
+
+    print(f"/detect ({args.app_duration:g}s clips, {args.requests} requests per level):")
+    app_duration = int(args.app_duration) if float(args.app_duration).is_integer() else args.app_duration
+    result["app"] = asyncio.run(bench_app(api, app_duration, args.concurrency, args.requests))
+    result["rss_mb"]["after_app"] = peak_rss_mb()
+
+    output = args.output or os.path.join(
+        api.BASE_DIR, "reports", "benchmarks", f"{time.strftime('%Y%m%d_%H%M%S')}_{result['meta']['commit'] or 'nogit'}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=4)
+    print(f"Peak RSS: {result['rss_mb']['after_app']} MB")
+    print(f"Saved {output}")
+
+    if args.compare:
+        compare(result, args.compare)
+
+if __name__ == "__main__":
+    main()
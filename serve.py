@@ -0,0 +1,132 @@
+"""
+Pre-fork multi-worker launcher for the detection API.
+
+The parent binds the listening socket, imports the app (profile, thresholds,
+librosa and the numba kernels), runs the warm-up clip once, freezes the GC
+and then forks WEB_CONCURRENCY uvicorn workers. The workers accept on the
+shared socket and share the parent's loaded pages copy-on-write; per-process
+state (inference pool, result cache, metrics, audit log) is created after
+the fork.
+
+    python serve.py                   # WEB_CONCURRENCY workers on $PORT
+
+SIGTERM/SIGINT drain: workers stop accepting, finish in-flight requests
+(for up to GRACEFUL_TIMEOUT seconds) and exit. SIGHUP reloads the model in
+every worker. A worker that dies is replaced. POSIX only; on Windows run
+`uvicorn api:app`.
+"""
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", 8000))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 0)) or os.cpu_count() or 1
+GRACEFUL_TIMEOUT = float(os.getenv("GRACEFUL_TIMEOUT", 30))
+
+# One inference thread per worker process unless configured otherwise, so
+# WEB_CONCURRENCY processes do not each start a thread per core
+os.environ.setdefault("DETECT_WORKERS", "1")
+
+def bind_socket(host, port):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app, sock, worker_id):
+    """Forked child: serve until SIGTERM/SIGINT, then drain and return"""
+    import uvicorn
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGALRM, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)  # until the app's lifespan installs its reload handler
+    os.environ["SERVE_WORKER_ID"] = str(worker_id)
+
+    config = uvicorn.Config(app, timeout_graceful_shutdown=GRACEFUL_TIMEOUT, log_level="info")
+    uvicorn.Server(config).run(sockets=[sock])
+
+class PreforkServer:
+    def __init__(self, app, sock, workers):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.children = {}  # pid -> worker id
+        self.stopping = False
+
+    def spawn(self, worker_id):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.app, self.sock, worker_id)
+            # Normal interpreter exit, so the worker's atexit handlers flush
+            sys.exit(0)
+        self.children[pid] = worker_id
+
+    def signal_children(self, sig):
+        for pid in list(self.children):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        print(f"Draining {len(self.children)} workers (up to {GRACEFUL_TIMEOUT:g}s)")
+        self.signal_children(signal.SIGTERM)
+        # Hard stop for workers still busy well after the graceful timeout
+        signal.alarm(int(GRACEFUL_TIMEOUT) + 5)
+
+    def kill(self, signum, frame):
+        self.signal_children(signal.SIGKILL)
+
+    def reload(self, signum, frame):
+        self.signal_children(signal.SIGHUP)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGHUP, self.reload)
+        signal.signal(signal.SIGALRM, self.kill)
+
+        for worker_id in range(self.workers):
+            self.spawn(worker_id)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            worker_id = self.children.pop(pid, None)
+            if worker_id is None or self.stopping:
+                continue
+            print(f"Worker {worker_id} (pid {pid}) exited with status {status}, restarting")
+            time.sleep(1)  # avoid a tight crash loop
+            self.spawn(worker_id)
+        print("All workers stopped")
+
+def main():
+    sock = bind_socket(HOST, PORT)
+
+    # Everything loaded here is shared copy-on-write by the workers
+    started = time.perf_counter()
+    import api
+    if api.WARMUP:
+        api.warm_up_pipeline()
+    # Keep the collector from touching (and so copying) the preloaded objects
+    gc.collect()
+    gc.freeze()
+    print(f"Model {api.registry.current.version} loaded in {time.perf_counter() - started:.2f}s; "
+          f"starting {WEB_CONCURRENCY} workers on {HOST}:{PORT}")
+
+    PreforkServer(api.app, sock, WEB_CONCURRENCY).run()
+
+if __name__ == "__main__":
+    main()
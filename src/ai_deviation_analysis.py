@@ -9,7 +9,8 @@ import json
 import librosa
 from tqdm import tqdm
 import matplotlib.pyplot as plt
-from feature_engineering import FeatureExtractor
+from feature_engineering import FeatureExtractor, flatten_features
+from feature_store import FeatureStore
 from anomaly_detection import AnomalyScorer
 
 def convert_mp3_to_wav(mp3_path, wav_path):
@@ -43,6 +44,7 @@ def analyze_ai_samples():
     # Initialize
     extractor = FeatureExtractor(sr=16000)
     scorer = AnomalyScorer(profile_path)
+    store = FeatureStore("e:/HCL/data/feature_store", extractor.config_id())
     
     ai_results = []
     
@@ -53,31 +55,26 @@ def analyze_ai_samples():
         mp3_path = os.path.join(ai_dir, mp3_file)
         
         try:
-            # Load MP3 directly with librosa
-            y, sr = librosa.load(mp3_path, sr=16000)
-            duration = len(y) / sr
-            
-            # Save as WAV for feature extraction
-            wav_path = mp3_path.replace('.mp3', '.wav')
-            import soundfile as sf
-            sf.write(wav_path, y, 16000)
-            
-            # Extract features
-            feat = extractor.extract_all(wav_path)
-            if not feat:
-                continue
-            
-            # Flatten features
-            flat_feat = {}
-            for k, v in feat.items():
-                if isinstance(v, list):
-                    for i, val in enumerate(v):
-                        flat_feat[f"{k}_{i}"] = val
-                else:
-                    flat_feat[k] = v
-            
-            # Get audio duration and estimate SNR (already loaded above)
-            # duration already calculated
+            cached = store.get(mp3_path)
+            if cached:
+                flat_feat = cached['features']
+                duration = cached['duration_sec']
+            else:
+                # Load MP3 directly with librosa
+                y, sr = librosa.load(mp3_path, sr=16000)
+                duration = len(y) / sr
+                
+                # Save as WAV for feature extraction
+                wav_path = mp3_path.replace('.mp3', '.wav')
+                import soundfile as sf
+                sf.write(wav_path, y, 16000)
+                
+                # Extract features
+                feat = extractor.extract_all(wav_path)
+                if not feat:
+                    continue
+                flat_feat = flatten_features(feat)
+                store.put(mp3_path, flat_feat, duration_sec=duration)
             
             # Compute anomaly score
             anomaly_score, reliability = scorer.score(flat_feat, snr=50, duration=duration)
@@ -108,6 +105,9 @@ def analyze_ai_samples():
             print(f"Error processing {mp3_file}: {e}")
             continue
     
+    store.flush()
+    print(f"Feature store: {store.hits} reused, {store.misses} extracted")
+    
     # Save results
     if len(ai_results) == 0:
         print("No AI samples were successfully processed.")
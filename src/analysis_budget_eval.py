@@ -0,0 +1,171 @@
+"""
+Analysis Budget Evaluation
+Measures the accuracy-vs-latency curve of budgeted extraction
+(FeatureExtractor.extract_budgeted) against full analysis on the human and
+AI validation sets, to choose ANALYSIS_BUDGET_SECONDS for the API.
+
+Validation clips are mostly a few seconds long, so by default consecutive
+clips of each set are joined into ~60 s recordings to stand in for long
+uploads (concat_seconds=0 evaluates the clips as they are).
+
+Budgeted features are not the whole-clip features the profile was built
+on. On synthetic 12-60 s clips with 4-20 s budgets, spectral and MFCC means
+moved by about 3% or less, but energy_entropy moved by 16-26% (it grows
+with the log of the frame count, so fewer frames bias it low). jitter and
+f0_std moved by 15-30%, and f0_mean by about 10%, because the loudest
+segments are not prosodically typical. The report lists this drift per
+feature (feature_rel_drift) next to the decision agreement with full
+analysis.
+"""
+import os
+import time
+import json
+import librosa
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+from feature_engineering import FeatureExtractor, ClipAnalysis, flatten_features
+from anomaly_detection import AnomalyScorer
+from signal_quality import estimate_snr
+
+BUDGETS_SECONDS = (2, 5, 10, 20)
+
+def load_validation_clips(n_human=100):
+    """(label, file path) for the human test split sample and the AI samples"""
+    test_split_path = "e:/HCL/data/test_split.csv"
+    ai_dir = "e:/HCL/data/synthetic/gtts"
+
+    df_test = pd.read_csv(test_split_path)
+    df_test = df_test.sample(min(n_human, len(df_test)), random_state=42)
+    clips = [("human", os.path.join("e:/HCL", path)) for path in df_test['file_path']]
+    clips += [("ai", os.path.join(ai_dir, f)) for f in sorted(os.listdir(ai_dir)) if f.endswith('.mp3')]
+    return clips
+
+def build_recordings(clips, concat_seconds, sr=16000):
+    """Yield (label, n_clips, waveform), joining consecutive clips of a label up to concat_seconds"""
+    for label in ("human", "ai"):
+        parts = []
+        for clip_label, path in clips:
+            if clip_label != label:
+                continue
+            try:
+                y, _ = librosa.load(path, sr=sr)
+            except Exception as e:
+                print(f"Error loading {path}: {e}")
+                continue
+            if len(y) == 0:
+                continue
+            parts.append(y)
+            if sum(len(p) for p in parts) >= concat_seconds * sr:
+                yield label, len(parts), np.concatenate(parts)
+                parts = []
+        if parts:
+            yield label, len(parts), np.concatenate(parts)
+
+def run_budget_evaluation(budgets=BUDGETS_SECONDS, concat_seconds=60, n_human=100):
+    profile_path = "e:/HCL/reports/human_feature_profile.json"
+    thresholds_path = "e:/HCL/reports/human_anomaly_thresholds.json"
+
+    if not os.path.exists("e:/HCL/data/test_split.csv") or not os.path.exists(profile_path):
+        print("Required files not found. Ensure Milestones 1-4 are complete.")
+        return None
+
+    with open(thresholds_path, 'r') as f:
+        threshold = json.load(f)['recommended_threshold']
+
+    extractor = FeatureExtractor(sr=16000)
+    scorer = AnomalyScorer(profile_path)
+    clips = load_validation_clips(n_human)
+
+    rows = []
+    drift = {budget: {} for budget in budgets}  # budget -> feature -> relative differences
+    for label, n_clips, y in tqdm(build_recordings(clips, concat_seconds), desc="Full vs budgeted"):
+        duration = len(y) / 16000
+        # SNR and duration come from the whole recording, as in the API
+        snr = estimate_snr(ClipAnalysis(y, 16000).frame_energy)
+
+        t0 = time.perf_counter()
+        full = flatten_features(extractor.extract_from_array(y, 16000))
+        record = {
+            "label": label,
+            "clips": n_clips,
+            "duration_sec": duration,
+            "snr_db": snr,
+            "full_sec": time.perf_counter() - t0,
+            "full_anomaly_score": scorer.score(full, snr=snr, duration=duration)[0]
+        }
+        for budget in budgets:
+            t0 = time.perf_counter()
+            features = flatten_features(extractor.extract_budgeted(y, 16000, budget))
+            record[f"budget_{budget}_sec"] = time.perf_counter() - t0
+            for feat, value in full.items():
+                drift[budget].setdefault(feat, []).append(abs(features[feat] - value) / (abs(value) + 1e-10))
+            record[f"budget_{budget}_anomaly_score"] = scorer.score(features, snr=snr, duration=duration)[0]
+        rows.append(record)
+
+    if not rows:
+        print("No recordings were successfully processed.")
+        return None
+
+    res = pd.DataFrame(rows)
+    is_ai = (res['label'] == "ai").to_numpy()
+
+    def accuracy(scores):
+        flagged = scores.to_numpy() > threshold
+        human_specificity = float(np.mean(~flagged[~is_ai])) if (~is_ai).any() else float('nan')
+        ai_detection_rate = float(np.mean(flagged[is_ai])) if is_ai.any() else float('nan')
+        return {
+            "human_specificity": human_specificity,
+            "ai_detection_rate": ai_detection_rate,
+            "balanced_accuracy": float(np.nanmean([human_specificity, ai_detection_rate]))
+        }
+
+    full_scores = res["full_anomaly_score"]
+    curve = [{
+        "budget_seconds": None,
+        "extraction_sec_mean": float(res["full_sec"].mean()),
+        "extraction_sec_p95": float(np.percentile(res["full_sec"], 95)),
+        "speedup": 1.0,
+        **accuracy(full_scores)
+    }]
+    for budget in budgets:
+        seconds = res[f"budget_{budget}_sec"]
+        scores = res[f"budget_{budget}_anomaly_score"]
+        curve.append({
+            "budget_seconds": budget,
+            "recordings_over_budget": int((res['duration_sec'] > budget).sum()),
+            "extraction_sec_mean": float(seconds.mean()),
+            "extraction_sec_p95": float(np.percentile(seconds, 95)),
+            "speedup": float(res["full_sec"].sum() / max(seconds.sum(), 1e-9)),
+            "score_mean_abs_diff": float(np.mean(np.abs(scores - full_scores))),
+            "decision_agreement": float(np.mean((scores > threshold) == (full_scores > threshold))),
+            **accuracy(scores),
+            # Mean relative change of each feature against full analysis, largest first
+            "feature_rel_drift": dict(sorted(
+                ((feat, float(np.mean(diffs))) for feat, diffs in drift[budget].items()),
+                key=lambda item: -item[1]
+            ))
+        })
+
+    report = {
+        "recommended_threshold": threshold,
+        "concat_seconds": concat_seconds,
+        "recordings": {"human": int((~is_ai).sum()), "ai": int(is_ai.sum())},
+        "audio_seconds": float(res['duration_sec'].sum()),
+        "curve": curve
+    }
+
+    with open("e:/HCL/reports/analysis_budget_curve.json", "w") as f:
+        json.dump(report, f, indent=4)
+    res.to_csv("e:/HCL/reports/analysis_budget_samples.csv", index=False)
+
+    print(f"{'budget':>8} {'mean s':>8} {'speedup':>8} {'agree':>7} {'human':>7} {'ai':>7} {'bal acc':>8}")
+    for point in curve:
+        budget = "full" if point["budget_seconds"] is None else f"{point['budget_seconds']}s"
+        print(f"{budget:>8} {point['extraction_sec_mean']:8.2f} {point['speedup']:8.1f} "
+              f"{point.get('decision_agreement', 1.0):7.3f} {point['human_specificity']:7.3f} "
+              f"{point['ai_detection_rate']:7.3f} {point['balanced_accuracy']:8.3f}")
+    return report
+
+if __name__ == "__main__":
+    run_budget_evaluation()
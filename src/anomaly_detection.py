@@ -2,59 +2,132 @@ import json
 import numpy as np
 import os
 
+# Feature categories, matched by substring against flattened feature names
+CATEGORY_KEYWORDS = {
+    "spectral": ("mfcc", "centroid", "bandwidth", "flatness", "rolloff"),
+    "prosodic": ("f0", "jitter", "shimmer"),
+    "temporal": ("zcr", "energy_entropy")
+}
+CATEGORIES = tuple(CATEGORY_KEYWORDS)
+
+def feature_category(feat_name):
+    for cat, keywords in CATEGORY_KEYWORDS.items():
+        if any(keyword in feat_name for keyword in keywords):
+            return cat
+    return None
+
 class AnomalyScorer:
     def __init__(self, profile_path):
         if not os.path.exists(profile_path):
             raise FileNotFoundError(f"Profile not found at {profile_path}")
             
         with open(profile_path, 'r') as f:
-            self.profile = json.load(f)
-        
+            self._load_profile(json.load(f))
+
+    @classmethod
+    def from_profile(cls, profile):
+        """Build a scorer from an already parsed profile dict"""
+        scorer = cls.__new__(cls)
+        scorer._load_profile(profile)
+        return scorer
+
+    def _load_profile(self, profile):
+        self.profile = profile
         self.means = self.profile['mean']
         self.stds = self.profile['std']
+        self._compile_profile()
 
-    def calculate_raw_scores(self, sample_features):
+    def _compile_profile(self):
         """
-        Compute z-scores for all features.
+        Compile the profile into fixed-order vectors and category masks
+        so scoring is a single vectorized pass.
         """
-        feature_scores = {}
+        self.feature_names = list(self.means.keys())
+        self._feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        self.mean_vector = np.array([self.means[k] for k in self.feature_names], dtype=float)
+        self.std_vector = np.array([self.stds.get(k, 0) for k in self.feature_names], dtype=float)
+        # Features with zero (or undefined) spread cannot be z-scored
+        self.usable_mask = self.std_vector > 0
+        self._safe_std = np.where(self.usable_mask, self.std_vector, 1.0)
+        # (n_categories, n_features) membership matrix
+        self.category_masks = np.array(
+            [[feature_category(k) == cat for k in self.feature_names] for cat in CATEGORIES],
+            dtype=float
+        )
+
+    def vectorize(self, sample_features):
+        """Map a flat feature dict onto the profile order (NaN for missing features)"""
+        vec = np.full(len(self.feature_names), np.nan)
         for feat_name, value in sample_features.items():
-            if feat_name in self.means and self.stds[feat_name] > 0:
-                z = (value - self.means[feat_name]) / self.stds[feat_name]
-                feature_scores[feat_name] = abs(z)
-        return feature_scores
+            i = self._feature_index.get(feat_name)
+            if i is not None:
+                vec[i] = value
+        return vec
 
-    def score(self, sample_features, snr=None, duration=None):
-        """
-        Compute a reliability-aware anomaly index.
-        """
-        feature_scores = self.calculate_raw_scores(sample_features)
-        if not feature_scores:
-            return 0.0, 0.0
-            
-        # Group scores by category
-        spectral_keys = [k for k in feature_scores.keys() if 'mfcc' in k or 'centroid' in k or 'bandwidth' in k or 'flatness' in k or 'rolloff' in k]
-        prosodic_keys = [k for k in feature_scores.keys() if 'f0' in k or 'jitter' in k or 'shimmer' in k]
-        temporal_keys = [k for k in feature_scores.keys() if 'zcr' in k or 'energy_entropy' in k]
-        
-        spectral_score = np.mean([feature_scores[k] for k in spectral_keys]) if spectral_keys else 0
-        prosodic_score = np.mean([feature_scores[k] for k in prosodic_keys]) if prosodic_keys else 0
-        temporal_score = np.mean([feature_scores[k] for k in temporal_keys]) if temporal_keys else 0
-        
-        # Combined anomaly score (forensic mean)
-        base_anomaly_score = (spectral_score + prosodic_score + temporal_score) / 3
-        
-        # Reliability Assessment
-        # SNR < 20dB or duration < 1.0s reduces reliability
+    def z_scores(self, matrix):
+        """Absolute z-scores for an (N, n_features) matrix; NaN where not scorable"""
+        matrix = np.atleast_2d(np.asarray(matrix, dtype=float))
+        z = np.abs((matrix - self.mean_vector) / self._safe_std)
+        z[:, ~self.usable_mask] = np.nan
+        return z
+
+    def category_deviations(self, z):
+        """Mean |z| per category as an (N, 3) array; 0 for categories without scores"""
+        present = ~np.isnan(z)
+        sums = np.where(present, z, 0.0) @ self.category_masks.T
+        counts = present.astype(float) @ self.category_masks.T
+        return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+    @staticmethod
+    def reliability(snr=None, duration=None):
+        """Reliability factor; snr and duration may be scalars or arrays (independent of the profile)"""
         reliability = 1.0
         if snr is not None:
             # Linear penalty for low SNR below 30dB
-            reliability *= np.clip(snr / 30.0, 0.5, 1.0)
+            reliability = reliability * np.clip(np.asarray(snr, dtype=float) / 30.0, 0.5, 1.0)
         if duration is not None:
             # Linear penalty for short duration below 2s
-            reliability *= np.clip(duration / 2.0, 0.5, 1.0)
-            
-        return float(base_anomaly_score), float(reliability)
+            reliability = reliability * np.clip(np.asarray(duration, dtype=float) / 2.0, 0.5, 1.0)
+        return reliability
+
+    def calculate_raw_scores(self, sample_features):
+        """
+        Compute z-scores for all features.
+        """
+        z = self.z_scores(self.vectorize(sample_features))[0]
+        return {self.feature_names[i]: float(z[i]) for i in np.flatnonzero(~np.isnan(z))}
+
+    def score_batch(self, matrix, snr=None, duration=None, return_categories=False):
+        """
+        Score N clips at once.
+
+        Args:
+            matrix: (N, n_features) array in self.feature_names order (NaN = missing)
+            snr, duration: Scalars or length-N arrays (optional)
+            return_categories: Also return the (N, 3) category deviations,
+                ready for DecisionEngine.decide_batch
+
+        Returns:
+            (anomaly_scores, reliabilities) arrays of length N
+        """
+        z = self.z_scores(matrix)
+        # Combined anomaly score (forensic mean of the category means)
+        categories = self.category_deviations(z)
+        scores = categories.mean(axis=1)
+        reliability = np.broadcast_to(self.reliability(snr, duration), scores.shape)
+        # Clips with no scorable features get (0, 0), as in score()
+        scored = (~np.isnan(z)).any(axis=1)
+        scores, reliability = np.where(scored, scores, 0.0), np.where(scored, reliability, 0.0)
+        if return_categories:
+            return scores, reliability, categories
+        return scores, reliability
+
+    def score(self, sample_features, snr=None, duration=None):
+        """
+        Compute a reliability-aware anomaly index.
+        """
+        scores, reliability = self.score_batch(self.vectorize(sample_features), snr=snr, duration=duration)
+        return float(scores[0]), float(reliability[0])
 
 def demo_anomaly_scoring():
     profile_path = "e:/HCL/reports/human_feature_profile.json"
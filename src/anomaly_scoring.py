@@ -2,20 +2,13 @@ import json
 import numpy as np
 import os
 import pandas as pd
-import logging
 from datetime import datetime
 from typing import Dict, List, Any
-
-# Setup logging
-os.makedirs("e:/HCL/logs", exist_ok=True)
-logging.basicConfig(
-    filename="e:/HCL/logs/anomaly_inference.log",
-    level=logging.INFO,
-    format='%(asctime)s - %(message)s'
-)
+from audit_log import get_audit_logger
 
 class AnomalyScorer:
-    def __init__(self, profile_path: str, thresholds_path: str = "e:/HCL/reports/human_anomaly_thresholds.json"):
+    def __init__(self, profile_path: str, thresholds_path: str = "e:/HCL/reports/human_anomaly_thresholds.json",
+                 audit_log_path: str = "e:/HCL/logs/anomaly_inference.jsonl", audit_sample_rate: float = 1.0):
         if not os.path.exists(profile_path):
             raise FileNotFoundError(f"Profile not found at {profile_path}")
             
@@ -38,6 +31,9 @@ class AnomalyScorer:
             "temporal": ["zcr_mean", "energy_entropy"]
         }
 
+        # Inference records go through a background writer (see audit_log.py)
+        self.audit = get_audit_logger(audit_log_path, sample_rate=audit_sample_rate) if audit_log_path else None
+
     def _get_category_for_feature(self, feat_name: str) -> str:
         for cat, prefixes in self.categories.items():
             for prefix in prefixes:
@@ -119,7 +115,12 @@ class AnomalyScorer:
         }
         
         # Log inference
-        logging.info(f"Inference: score={report['final_anomaly_score']}, reliability={report['reliability_factor']}, interpretation='{interpretation}'")
+        if self.audit is not None:
+            self.audit.info("inference", extra={"audit": {
+                "score": report['final_anomaly_score'],
+                "reliability": report['reliability_factor'],
+                "interpretation": interpretation
+            }})
         
         return report
 
@@ -0,0 +1,118 @@
+"""
+Non-blocking audit log for inference records.
+Callers only put records on a bounded in-memory queue (QueueHandler); a
+background QueueListener thread writes them as JSON lines to a size-rotated
+file and flushes in batches, so inference latency never waits on the disk.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, event and the `audit` fields"""
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "event": record.getMessage()
+        }
+        entry.update(getattr(record, "audit", {}))
+        return json.dumps(entry, default=str)
+
+class BatchingRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that flushes every `batch_size` records or
+    `flush_interval` seconds instead of after each record. A background
+    thread flushes a partial batch once the interval passes, so the last
+    records before a quiet spell reach the disk without waiting for more.
+    """
+    def __init__(self, filename, max_bytes, backup_count, batch_size=64, flush_interval=1.0):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="audit-log-flush", daemon=True)
+        self._flusher.start()
+
+    def flush(self, force=False):
+        # Called by emit() under the handler lock after every record
+        self._pending += 1
+        if force or self._pending >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush_now()
+
+    def _flush_now(self):
+        super().flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            with self.lock:
+                if self._pending:
+                    self._flush_now()
+
+    def close(self):
+        self._closed.set()
+        self.flush(force=True)
+        super().close()
+
+class SamplingFilter(logging.Filter):
+    """Keep a `rate` fraction of INFO records; warnings and errors always pass"""
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1.0 or random.random() < self.rate
+
+class DroppingQueueHandler(QueueHandler):
+    """Drops (and counts) records instead of blocking when the queue is full"""
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_loggers = {}
+_lock = threading.Lock()
+
+def get_audit_logger(path, sample_rate=1.0, max_bytes=10 * 1024 * 1024, backup_count=5, queue_size=10000):
+    """
+    Return the audit logger writing to `path`, starting its background writer
+    on first use. Log with logger.info("event", extra={"audit": {...}}).
+    """
+    with _lock:
+        if path in _loggers:
+            return _loggers[path]
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = BatchingRotatingFileHandler(path, max_bytes=max_bytes, backup_count=backup_count)
+        file_handler.setFormatter(JsonLinesFormatter())
+
+        queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+        listener = QueueListener(queue_handler.queue, file_handler)
+        listener.start()
+        # Drain the queue and flush the last batch on interpreter exit
+        atexit.register(listener.stop)
+
+        logger = logging.getLogger(f"audit.{len(_loggers)}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(queue_handler)
+        _loggers[path] = logger
+        return logger
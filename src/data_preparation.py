@@ -1,12 +1,21 @@
 import os
+import queue
+import argparse
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 import librosa
 import numpy as np
 import pandas as pd
 import soundfile as sf
-from datasets import load_dataset
 from tqdm import tqdm
 import json
 from sklearn.model_selection import train_test_split
+from signal_quality import estimate_snr, frame_energy
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg", ".mp3")
+CHECKPOINT_EVERY_ITEMS = 100
+CHECKPOINT_EVERY_SECONDS = 10.0
 
 class AudioStandardizer:
     def __init__(self, target_sr=16000):
@@ -33,85 +42,251 @@ class AudioStandardizer:
 
 def calculate_snr(audio_array):
     """
-    Simple SNR estimation: ratio of signal power to noise power.
+    Frame-based SNR estimation, shared with the API so reliability numbers
+    are consistent between preparation and inference.
     """
-    # Estimate noise from the quietest 10% of the signal energy
-    energy = audio_array**2
-    if len(energy) < 100: return 0
-    energy_sorted = np.sort(energy)
-    noise_floor_energy = np.mean(energy_sorted[:max(1, len(energy)//10)])
-    signal_energy = np.mean(energy)
-    
-    if noise_floor_energy == 0:
-        return 50.0 # Arbitrary high SNR
-    
-    snr = 10 * np.log10(signal_energy / noise_floor_energy)
-    return snr
+    if len(audio_array) < 100: return 0
+    return estimate_snr(frame_energy(audio_array))
+
+class LocalAudioDataset:
+    """
+    On-disk stand-in for an IndicTTS split: the audio files of one directory
+    in name order, with genders from an optional metadata.csv (file_name, gender).
+    Items carry the file path and are decoded by the standardization workers.
+    """
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.files = sorted(f for f in os.listdir(root_dir) if f.lower().endswith(AUDIO_EXTENSIONS))
+        self.genders = {}
+        metadata_path = os.path.join(root_dir, "metadata.csv")
+        if os.path.exists(metadata_path):
+            meta = pd.read_csv(metadata_path)
+            if 'gender' in meta.columns:
+                self.genders = dict(zip(meta['file_name'], meta['gender']))
+
+    def __len__(self):
+        return len(self.files)
+
+    def __iter__(self):
+        for name in self.files:
+            yield {
+                "audio": {"path": os.path.join(self.root_dir, name)},
+                "gender": self.genders.get(name, 'unknown')
+            }
+
+def load_source(lang_name, repo_id, local_dir=None):
+    """Open a language's source: a local directory if given, else the Hugging Face dataset"""
+    if local_dir:
+        lang_dir = os.path.join(local_dir, lang_name)
+        if not os.path.isdir(lang_dir):
+            print(f"Local dataset not found for {lang_name}: {lang_dir}")
+            return None
+        return LocalAudioDataset(lang_dir)
+
+    from datasets import load_dataset
 
-def prepare_dataset(lang_name, repo_id, output_dir, limit=100):
-    print(f"Processing {lang_name} from {repo_id} (Limit: {limit})...")
-    os.makedirs(os.path.join(output_dir, lang_name), exist_ok=True)
-    
     # Try streaming first to save time/space
     try:
-        ds = load_dataset(repo_id, split='train', streaming=True, trust_remote_code=True)
+        return load_dataset(repo_id, split='train', streaming=True, trust_remote_code=True)
     except Exception as e:
         print(f"Streaming not supported for {repo_id}, falling back to download: {e}")
         try:
-            ds = load_dataset(repo_id, split='train', trust_remote_code=True)
+            return load_dataset(repo_id, split='train', trust_remote_code=True)
         except Exception as e2:
             print(f"Fatal error loading {repo_id}: {e2}")
             return None
 
-    standardizer = AudioStandardizer(target_sr=16000)
-    metadata = []
-    
-    count = 0
-    # Iterate with tqdm
-    pbar = tqdm(total=limit, desc=f"Progress {lang_name}")
-    for item in ds:
-        if count >= limit:
-            break
-            
-        audio_data = item['audio']
-        audio_array = audio_data['array']
-        original_sr = audio_data['sampling_rate']
-        
-        # Standardize
-        processed_audio = standardizer.process(audio_array, original_sr)
-        
-        # Quality Checks
-        duration = len(processed_audio) / 16000
-        snr = calculate_snr(processed_audio)
-        
-        # Filtering
-        if duration < 0.3: # Skip very short clips
-            continue
-            
-        # Save audio
-        filename = f"{lang_name}_{count:06d}.wav"
-        filepath = os.path.join(output_dir, lang_name, filename)
-        sf.write(filepath, processed_audio, 16000)
-        
-        metadata.append({
-            "id": f"{lang_name}_{count:06d}",
-            "language": lang_name,
-            "gender": item.get('gender', 'unknown'),
-            "duration_sec": round(duration, 3),
-            "snr_db": round(snr, 2),
-            "original_sr": original_sr,
-            "target_sr": 16000,
-            "file_path": os.path.join("data/processed", lang_name, filename),
-            "label": "human" # Ground truth
-        })
-        
-        count += 1
-        pbar.update(1)
-        
-    pbar.close()
-    return metadata
+class PrefetchReader:
+    """Iterates a dataset on a background thread, keeping up to `prefetch` items ready"""
+    _END = object()
+
+    def __init__(self, dataset, skip=(), prefetch=16):
+        self._queue = queue.Queue(maxsize=prefetch)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(dataset, set(skip)), daemon=True)
+        self._thread.start()
+
+    def _run(self, dataset, skip):
+        try:
+            for index, item in enumerate(dataset):
+                if self._stop.is_set():
+                    return
+                if index not in skip:
+                    self._put((index, item))
+        except Exception as e:
+            self._put(e)
+        finally:
+            self._put(self._END)
+
+    def _put(self, value):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(value, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self):
+        while True:
+            value = self._queue.get()
+            if value is self._END:
+                return
+            if isinstance(value, Exception):
+                raise value
+            yield value
+
+    def close(self):
+        self._stop.set()
+
+class PreparationCheckpoint:
+    """
+    Source indices already handled for one language (kept or deliberately
+    filtered out), and the clips kept so far. Items that failed are not
+    recorded, so a rerun tries them again.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        self.records = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                state = json.load(f)
+            self.done = set(state['done'])
+            self.records = {int(index): record for index, record in state['records'].items()}
+
+    @property
+    def kept(self):
+        return len(self.records)
+
+    def add(self, index, record):
+        self.done.add(index)
+        if record is not None:
+            self.records[index] = record
+
+    def save(self):
+        # Write-then-rename so an interrupt never leaves a truncated checkpoint
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"done": sorted(self.done), "records": self.records}, f)
+        os.replace(tmp_path, self.path)
+
+    def metadata(self):
+        return [self.records[index] for index in sorted(self.records)]
+
+def standardize_item(lang_name, index, audio, gender, output_dir, target_sr=16000):
+    """
+    Worker task: standardize one source clip, run quality checks and save it.
+    Returns its metadata record, or None if the clip was filtered out.
+    """
+    if 'array' in audio:
+        audio_array = np.asarray(audio['array'])
+        original_sr = audio['sampling_rate']
+    else:
+        audio_array, original_sr = librosa.load(audio['path'], sr=None, mono=False)
+
+    # Standardize
+    processed_audio = AudioStandardizer(target_sr=target_sr).process(audio_array, original_sr)
+
+    # Quality Checks
+    duration = len(processed_audio) / target_sr
+    snr = calculate_snr(processed_audio)
+
+    # Filtering
+    if duration < 0.3: # Skip very short clips
+        return None
+
+    # Save audio (named by source index so reruns overwrite rather than duplicate)
+    clip_id = f"{lang_name}_{index:06d}"
+    filename = f"{clip_id}.wav"
+    sf.write(os.path.join(output_dir, lang_name, filename), processed_audio, target_sr)
+
+    return {
+        "id": clip_id,
+        "language": lang_name,
+        "gender": gender,
+        "duration_sec": round(duration, 3),
+        "snr_db": round(float(snr), 2),
+        "original_sr": original_sr,
+        "target_sr": target_sr,
+        "file_path": os.path.join("data/processed", lang_name, filename),
+        "label": "human" # Ground truth
+    }
+
+def prepare_dataset(lang_name, repo_id, output_dir, executor, limit=100, local_dir=None, position=0, max_pending=None):
+    """
+    Prepare up to `limit` clips of one language on the shared worker pool.
+
+    A background reader prefetches source items while the workers standardize
+    them. At most `max_pending` items (default: twice the CPU count) are
+    submitted at once, so decoded clips do not pile up in the pool's queue.
+    Progress is checkpointed every CHECKPOINT_EVERY_ITEMS completions or
+    CHECKPOINT_EVERY_SECONDS, and on exit, so an interrupted run resumes
+    close to where it left off.
+    """
+    max_pending = max_pending or 2 * (os.cpu_count() or 1)
+    print(f"Processing {lang_name} from {local_dir or repo_id} (Limit: {limit})...")
+    os.makedirs(os.path.join(output_dir, lang_name), exist_ok=True)
+    checkpoint = PreparationCheckpoint(os.path.join(output_dir, lang_name, "checkpoint.json"))
+    if checkpoint.kept:
+        print(f"Resuming {lang_name}: {checkpoint.kept} clips already prepared")
+    if checkpoint.kept >= limit:
+        return checkpoint.metadata()[:limit]
+
+    ds = load_source(lang_name, repo_id, local_dir)
+    if ds is None:
+        return checkpoint.metadata() or None
+
+    reader = PrefetchReader(ds, skip=checkpoint.done)
+    items = iter(reader)
+    pending = {}
+    exhausted = False
+    failed = 0
+    unsaved = 0
+    last_save = time.monotonic()
+    pbar = tqdm(total=limit, initial=checkpoint.kept, desc=f"Progress {lang_name}", position=position)
+    try:
+        while True:
+            # Never have more clips in flight than are still needed, or than
+            # the workers can start on soon
+            while not exhausted and len(pending) < max_pending and checkpoint.kept + len(pending) < limit:
+                nxt = next(items, None)
+                if nxt is None:
+                    exhausted = True
+                    break
+                index, item = nxt
+                future = executor.submit(standardize_item, lang_name, index, item['audio'], item.get('gender', 'unknown'), output_dir)
+                pending[future] = index
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    record = future.result()
+                except Exception as e:
+                    # Left out of the checkpoint so the next run retries it
+                    failed += 1
+                    print(f"Error processing {lang_name} item {index}: {e!r}")
+                    continue
+                checkpoint.add(index, record)
+                unsaved += 1
+                if record is not None:
+                    pbar.update(1)
+            if unsaved >= CHECKPOINT_EVERY_ITEMS or time.monotonic() - last_save >= CHECKPOINT_EVERY_SECONDS:
+                checkpoint.save()
+                unsaved = 0
+                last_save = time.monotonic()
+    finally:
+        reader.close()
+        pbar.close()
+        checkpoint.save()
+
+    if failed:
+        print(f"{lang_name}: {failed} items failed and will be retried on the next run")
+    return checkpoint.metadata()
 
-def main():
+def main(local_dir=None, limit=100, workers=None):
     datasets_to_process = [
         ("Telugu", "SPRINGLab/IndicTTS_Telugu"),
         ("Hindi", "SPRINGLab/IndicTTS-Hindi"),
@@ -126,10 +301,23 @@ def main():
     
     all_metadata = []
     
-    for lang, repo in datasets_to_process:
-        meta = prepare_dataset(lang, repo, output_base_dir, limit=100) # 100 per lang for demonstration
-        if meta:
-            all_metadata.extend(meta)
+    # Languages are read concurrently and share one pool of standardization
+    # workers; together they keep about two items per worker in flight
+    max_pending = max(2, 2 * (workers or os.cpu_count() or 1) // len(datasets_to_process))
+    with ProcessPoolExecutor(max_workers=workers) as executor, ThreadPoolExecutor(max_workers=len(datasets_to_process)) as readers:
+        futures = [
+            readers.submit(prepare_dataset, lang, repo, output_base_dir, executor, limit=limit, local_dir=local_dir,
+                           position=position, max_pending=max_pending)
+            for position, (lang, repo) in enumerate(datasets_to_process)
+        ]
+        for (lang, _), future in zip(datasets_to_process, futures):
+            try:
+                meta = future.result()
+            except Exception as e:
+                print(f"Error preparing {lang}: {e}")
+                continue
+            if meta:
+                all_metadata.extend(meta)
             
     if not all_metadata:
         print("No data processed. Exiting.")
@@ -157,4 +345,9 @@ def main():
     print("Milestone 1 Completed Successfully.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Milestone 1: prepare the human speech corpus")
+    parser.add_argument("--local-dir", help="Read <dir>/<Language>/ audio files instead of the Hugging Face datasets")
+    parser.add_argument("--limit", type=int, default=100, help="Clips per language (100 for demonstration)")
+    parser.add_argument("--workers", type=int, default=None, help="Standardization worker processes (default: all cores)")
+    args = parser.parse_args()
+    main(local_dir=args.local_dir, limit=args.limit, workers=args.workers)
@@ -5,21 +5,50 @@ Makes final classification decisions based on anomaly scores and reliability.
 import json
 import numpy as np
 
+try:
+    from .anomaly_detection import CATEGORIES, feature_category
+except ImportError:
+    from anomaly_detection import CATEGORIES, feature_category
+
+# Mean |z| above which a feature category counts as deviating
+CATEGORY_DEVIATION = 1.5
+
 class DecisionEngine:
     def __init__(self, thresholds_path="e:/HCL/reports/human_anomaly_thresholds.json"):
         """Initialize decision engine with calibrated thresholds"""
         with open(thresholds_path, 'r') as f:
-            thresholds = json.load(f)
-        
+            self._load_thresholds(json.load(f))
+
+    @classmethod
+    def from_thresholds(cls, thresholds):
+        """Build an engine from an already parsed thresholds dict"""
+        engine = cls.__new__(cls)
+        engine._load_thresholds(thresholds)
+        return engine
+
+    def _load_thresholds(self, thresholds):
         self.human_threshold = thresholds['recommended_threshold']
         self.min_reliability = 0.7  # Minimum reliability for confident decisions
-        
-    def calculate_confidence(self, anomaly_score, reliability, feature_scores):
+
+    def category_scores(self, feature_scores):
+        """Mean |z| per category (spectral, prosodic, temporal) in one pass; 0 if a category has no scores"""
+        sums = dict.fromkeys(CATEGORIES, 0.0)
+        counts = dict.fromkeys(CATEGORIES, 0)
+        for name, value in feature_scores.items():
+            cat = feature_category(name)
+            if cat is not None:
+                sums[cat] += value
+                counts[cat] += 1
+        return tuple(sums[cat] / counts[cat] if counts[cat] else 0 for cat in CATEGORIES)
+
+    def calculate_confidence(self, anomaly_score, reliability, feature_scores, categories=None):
         """
         Calculate confidence score based on:
         - Distance from threshold
         - Reliability factor
         - Feature group agreement
+
+        `categories` are precomputed category_scores(feature_scores).
         """
         # Distance-based confidence
         if anomaly_score <= self.human_threshold:
@@ -29,21 +58,10 @@ class DecisionEngine:
             # For AI classification: how far above threshold
             distance_factor = min(1.0, (anomaly_score - self.human_threshold) / self.human_threshold)
         
-        # Feature group agreement (how many categories show deviation)
-        spectral_keys = [k for k in feature_scores.keys() if 'mfcc' in k or 'centroid' in k or 'bandwidth' in k or 'flatness' in k or 'rolloff' in k]
-        prosodic_keys = [k for k in feature_scores.keys() if 'f0' in k or 'jitter' in k or 'shimmer' in k]
-        temporal_keys = [k for k in feature_scores.keys() if 'zcr' in k or 'energy_entropy' in k]
-        
-        spectral_score = np.mean([feature_scores[k] for k in spectral_keys]) if spectral_keys else 0
-        prosodic_score = np.mean([feature_scores[k] for k in prosodic_keys]) if prosodic_keys else 0
-        temporal_score = np.mean([feature_scores[k] for k in temporal_keys]) if temporal_keys else 0
-        
-        # Count how many categories exceed threshold (>1.5 z-score)
-        deviating_categories = sum([
-            spectral_score > 1.5,
-            prosodic_score > 1.5,
-            temporal_score > 1.5
-        ])
+        # Feature group agreement: how many categories exceed threshold (>1.5 z-score)
+        if categories is None:
+            categories = self.category_scores(feature_scores)
+        deviating_categories = sum(score > CATEGORY_DEVIATION for score in categories)
         
         agreement_factor = deviating_categories / 3.0
         
@@ -65,20 +83,16 @@ class DecisionEngine:
         else:
             return "HIGH"  # Significantly above threshold (strong AI signal)
     
-    def generate_explanation(self, anomaly_score, feature_scores, reliability):
+    def generate_explanation(self, anomaly_score, feature_scores, reliability, categories=None):
         """
         Generate human-readable explanation for the decision
         """
         explanations = {}
         
         # Categorize feature scores
-        spectral_keys = [k for k in feature_scores.keys() if 'mfcc' in k or 'centroid' in k or 'bandwidth' in k or 'flatness' in k or 'rolloff' in k]
-        prosodic_keys = [k for k in feature_scores.keys() if 'f0' in k or 'jitter' in k or 'shimmer' in k]
-        temporal_keys = [k for k in feature_scores.keys() if 'zcr' in k or 'energy_entropy' in k]
-        
-        spectral_score = np.mean([feature_scores[k] for k in spectral_keys]) if spectral_keys else 0
-        prosodic_score = np.mean([feature_scores[k] for k in prosodic_keys]) if prosodic_keys else 0
-        temporal_score = np.mean([feature_scores[k] for k in temporal_keys]) if temporal_keys else 0
+        if categories is None:
+            categories = self.category_scores(feature_scores)
+        spectral_score, prosodic_score, temporal_score = categories
         
         # Spectral explanation
         if spectral_score > 1.5:
@@ -135,12 +149,13 @@ class DecisionEngine:
         else:
             result = "UNCERTAIN"
         
-        # Calculate confidence and risk
-        confidence = self.calculate_confidence(anomaly_score, reliability, feature_scores)
+        # Calculate confidence and risk (category means computed once for both)
+        categories = self.category_scores(feature_scores)
+        confidence = self.calculate_confidence(anomaly_score, reliability, feature_scores, categories)
         risk_level = self.calculate_risk_level(anomaly_score, reliability)
         
         # Generate explanations
-        explanations = self.generate_explanation(anomaly_score, feature_scores, reliability)
+        explanations = self.generate_explanation(anomaly_score, feature_scores, reliability, categories)
         
         # Signal quality assessment
         if reliability >= 0.9:
@@ -163,6 +178,80 @@ class DecisionEngine:
             "explanations": explanations
         }
 
+    def triage(self, reliability):
+        """
+        Decision for a clip whose reliability (from SNR and duration alone) is
+        below min_reliability, or None if the clip needs full analysis.
+
+        Such a clip can only end HUMAN or UNCERTAIN (reported as HUMAN), so the
+        features cannot change the classification. The result is the full
+        path's UNCERTAIN verdict, whose public confidence is capped at 0.5;
+        a clip the full path would have scored within the human range is
+        HUMAN there too, but with a different (distance-based) confidence.
+        """
+        if reliability >= self.min_reliability:
+            return None
+        return {
+            "result": "UNCERTAIN",
+            "confidence": 0.5,
+            "risk_level": "HIGH",
+            "signal_quality": "POOR",
+            "reliability": round(reliability, 3),
+            "threshold": round(self.human_threshold, 4)
+        }
+
+    def decide_batch(self, anomaly_scores, reliabilities, category_scores, explain=False, feature_scores=None):
+        """
+        Vectorized decide() for N clips.
+
+        Args:
+            anomaly_scores, reliabilities: Length-N arrays
+            category_scores: (N, 3) mean |z| per category, as AnomalyScorer.category_deviations
+            explain: Also render the explanation dicts (slow; off by default)
+            feature_scores: Per-clip feature z-score dicts, used only by the explanations
+
+        Returns:
+            dict of length-N arrays: result, confidence (unrounded), risk_level,
+            signal_quality (plus an "explanations" list when explain=True)
+        """
+        scores = np.asarray(anomaly_scores, dtype=float)
+        reliability = np.asarray(reliabilities, dtype=float)
+        categories = np.asarray(category_scores, dtype=float).reshape(len(scores), len(CATEGORIES))
+        threshold = self.human_threshold
+        human = scores <= threshold
+        reliable = reliability >= self.min_reliability
+
+        result = np.where(human, "HUMAN", np.where(reliable, "AI_GENERATED", "UNCERTAIN"))
+
+        distance_factor = np.where(human, 1.0 - scores / threshold, np.minimum(1.0, (scores - threshold) / threshold))
+        agreement_factor = (categories > CATEGORY_DEVIATION).sum(axis=1) / 3.0
+        confidence = np.clip(distance_factor * 0.5 + reliability * 0.3 + agreement_factor * 0.2, 0, 1)
+
+        risk_level = np.where(~reliable | (scores > threshold * 1.5), "HIGH", np.where(human, "LOW", "MEDIUM"))
+        signal_quality = np.select(
+            [reliability >= 0.9, reliability >= 0.8, reliability >= 0.7],
+            ["EXCELLENT", "GOOD", "FAIR"],
+            "POOR"
+        )
+
+        decisions = {
+            "result": result,
+            "confidence": confidence,
+            "risk_level": risk_level,
+            "signal_quality": signal_quality
+        }
+        if explain:
+            decisions["explanations"] = [
+                self.generate_explanation(
+                    float(scores[i]),
+                    feature_scores[i] if feature_scores is not None else {},
+                    float(reliability[i]),
+                    tuple(float(v) for v in categories[i])
+                )
+                for i in range(len(scores))
+            ]
+        return decisions
+
 def demo_decision_engine():
     """Demo the decision engine"""
     engine = DecisionEngine()
@@ -0,0 +1,128 @@
+"""
+F0 Backend Parity Report
+Compares the fast YIN pitch backend against the calibrated pYIN backend on
+human corpus samples, so the fast path can be adopted without threshold drift.
+"""
+import os
+import time
+import json
+import librosa
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+from feature_engineering import FeatureExtractor, flatten_features
+from anomaly_detection import AnomalyScorer
+
+PROSODIC_FEATURES = ["f0_mean", "f0_std", "jitter", "shimmer"]
+
+def run_parity_report(n_samples=50, candidate_backend="yin"):
+    metadata_path = "e:/HCL/reports/human_corpus_metadata.csv"
+    profile_path = "e:/HCL/reports/human_feature_profile.json"
+    thresholds_path = "e:/HCL/reports/human_anomaly_thresholds.json"
+
+    if not os.path.exists(metadata_path) or not os.path.exists(profile_path):
+        print("Required files not found. Ensure Milestones 1 & 2 are complete.")
+        return None
+
+    df = pd.read_csv(metadata_path)
+    df = df.sample(min(n_samples, len(df)), random_state=42)
+
+    with open(thresholds_path, 'r') as f:
+        threshold = json.load(f)['recommended_threshold']
+
+    reference = FeatureExtractor(sr=16000, f0_backend="pyin")
+    candidate = FeatureExtractor(sr=16000, f0_backend=candidate_backend)
+    scorer = AnomalyScorer(profile_path)
+
+    rows = []
+    for idx, row in tqdm(df.iterrows(), total=len(df), desc=f"pyin vs {candidate_backend}"):
+        file_path = os.path.join("e:/HCL", row['file_path'])
+        try:
+            y, _ = librosa.load(file_path, sr=16000)
+        except Exception as e:
+            print(f"Error loading {row['file_path']}: {e}")
+            continue
+        if len(y) == 0:
+            continue
+
+        t0 = time.perf_counter()
+        ref_f0, ref_voiced = reference.track_pitch(y)
+        t1 = time.perf_counter()
+        cand_f0, cand_voiced = candidate.track_pitch(y)
+        t2 = time.perf_counter()
+
+        ref_feat = flatten_features(reference.extract_from_array(y, 16000))
+        cand_feat = flatten_features(candidate.extract_from_array(y, 16000))
+        ref_score, _ = scorer.score(ref_feat)
+        cand_score, _ = scorer.score(cand_feat)
+
+        both_voiced = ref_voiced & cand_voiced
+        f0_ratio = cand_f0[both_voiced] / ref_f0[both_voiced]
+
+        record = {
+            "id": row['id'],
+            "duration_sec": len(y) / 16000,
+            "pyin_sec": t1 - t0,
+            f"{candidate_backend}_sec": t2 - t1,
+            "voicing_agreement": float(np.mean(ref_voiced == cand_voiced)),
+            # Share of jointly voiced frames within a semitone of pYIN (no octave errors)
+            "f0_semitone_agreement": float(np.mean(np.abs(12 * np.log2(f0_ratio)) < 1)) if len(f0_ratio) else 1.0,
+            "pyin_anomaly_score": ref_score,
+            f"{candidate_backend}_anomaly_score": cand_score
+        }
+        for feat in PROSODIC_FEATURES:
+            record[f"pyin_{feat}"] = ref_feat[feat]
+            record[f"{candidate_backend}_{feat}"] = cand_feat[feat]
+        rows.append(record)
+
+    if not rows:
+        print("No samples were successfully processed.")
+        return None
+
+    res = pd.DataFrame(rows)
+    cand_scores = res[f"{candidate_backend}_anomaly_score"]
+    ref_scores = res["pyin_anomaly_score"]
+
+    feature_parity = {}
+    for feat in PROSODIC_FEATURES:
+        ref_vals = res[f"pyin_{feat}"]
+        cand_vals = res[f"{candidate_backend}_{feat}"]
+        feature_parity[feat] = {
+            "mean_abs_diff": float(np.mean(np.abs(cand_vals - ref_vals))),
+            "mean_rel_diff": float(np.mean(np.abs(cand_vals - ref_vals) / (np.abs(ref_vals) + 1e-10))),
+            "correlation": float(np.corrcoef(ref_vals, cand_vals)[0, 1]) if len(res) > 1 else 1.0
+        }
+
+    report = {
+        "candidate_backend": candidate_backend,
+        "candidate_range_hz": [candidate.fmin, candidate.fmax],
+        "samples": len(res),
+        "audio_seconds": float(res['duration_sec'].sum()),
+        "pitch_tracking_sec": {
+            "pyin": float(res['pyin_sec'].sum()),
+            candidate_backend: float(res[f"{candidate_backend}_sec"].sum()),
+            "speedup": float(res['pyin_sec'].sum() / max(res[f"{candidate_backend}_sec"].sum(), 1e-9))
+        },
+        "frame_agreement": {
+            "voicing": float(res['voicing_agreement'].mean()),
+            "f0_within_semitone": float(res['f0_semitone_agreement'].mean())
+        },
+        "feature_parity": feature_parity,
+        "anomaly_score_drift": {
+            "mean_abs_diff": float(np.mean(np.abs(cand_scores - ref_scores))),
+            "pyin_95th_percentile": float(np.percentile(ref_scores, 95)),
+            f"{candidate_backend}_95th_percentile": float(np.percentile(cand_scores, 95)),
+            "recommended_threshold": threshold,
+            "decision_agreement": float(np.mean((ref_scores > threshold) == (cand_scores > threshold)))
+        }
+    }
+
+    with open("e:/HCL/reports/f0_backend_parity.json", "w") as f:
+        json.dump(report, f, indent=4)
+    res.to_csv("e:/HCL/reports/f0_backend_parity_samples.csv", index=False)
+
+    print(json.dumps(report, indent=2))
+    return report
+
+if __name__ == "__main__":
+    run_parity_report()
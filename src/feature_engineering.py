@@ -1,18 +1,256 @@
 import os
+import io
+import tempfile
 import librosa
 import numpy as np
-import pandas as pd
+import soundfile as sf
+import soxr
 import json
-from tqdm import tqdm
-from scipy.stats import entropy
+import audioread
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+
+# Heavy or script-only dependencies (scipy.stats, pandas, tqdm, the feature
+# store) are imported where they are used, so importing this module for the
+# API stays cheap; librosa loads its numba-backed submodules on first use
+try:
+    from .metrics import span
+    from .signal_quality import select_segments
+except ImportError:
+    from metrics import span
+    from signal_quality import select_segments
+
+# Raised by decode_audio/decode_audio_stream for files the decoders cannot read
+DECODE_ERRORS = (sf.SoundFileError, audioread.DecodeError, EOFError)
+
+class AudioTooLong(ValueError):
+    """Raised by decode_audio_stream past max_duration"""
+
+def decode_audio(audio_bytes, sr=16000):
+    """
+    Decode an in-memory audio file (WAV/FLAC/OGG/MP3) to a mono waveform at sr.
+    """
+    try:
+        return librosa.load(io.BytesIO(audio_bytes), sr=sr)
+    except sf.SoundFileRuntimeError:
+        # Containers libsndfile cannot parse (e.g. AAC/M4A) need audioread,
+        # which only accepts paths, so fall back to a temporary file
+        with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
+            tmp_path = tmp_file.name
+            tmp_file.write(audio_bytes)
+        try:
+            return librosa.load(tmp_path, sr=sr)
+        finally:
+            os.remove(tmp_path)
+
+def decode_audio_stream(fileobj, sr=16000, max_duration=None, block_frames=65536):
+    """
+    Decode a seekable audio file object block by block to a mono waveform at sr.
+
+    Only one block of native audio is held at a time and resampling is streamed,
+    so peak memory is bounded by the decoded output. Raises AudioTooLong if
+    the audio is longer than max_duration seconds.
+    """
+    with sf.SoundFile(fileobj) as f:
+        native_sr = f.samplerate
+        if max_duration is not None and f.frames > max_duration * native_sr:
+            raise AudioTooLong(f"Audio too long (maximum {max_duration:g} seconds)")
+
+        resampler = soxr.ResampleStream(native_sr, sr, 1, dtype='float32', quality='HQ') if native_sr != sr else None
+        chunks = []
+        n_samples = 0
+        for block in f.blocks(blocksize=block_frames, dtype='float32', always_2d=True):
+            mono = block.mean(axis=1)
+            if resampler is not None:
+                mono = resampler.resample_chunk(mono)
+            n_samples += len(mono)
+            # Frame counts of compressed streams are estimates, so check as we go
+            if max_duration is not None and n_samples > max_duration * sr:
+                raise AudioTooLong(f"Audio too long (maximum {max_duration:g} seconds)")
+            chunks.append(mono)
+        if resampler is not None:
+            chunks.append(resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True))
+
+    y = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+    return y, sr
+
+def flatten_features(features):
+    """Flatten list-valued features (MFCC vectors) into name_i scalar entries"""
+    flat_features = {}
+    for k, v in features.items():
+        if isinstance(v, list):
+            for i, val in enumerate(v):
+                flat_features[f"{k}_{i}"] = val
+        else:
+            flat_features[k] = v
+    return flat_features
+
+class ClipAnalysis:
+    """
+    Per-clip cache of intermediate representations shared by the feature extractors.
+    Each representation is computed on first access and reused afterwards.
+    """
+    def __init__(self, y, sr, n_fft=2048, hop_length=512, center=True, zcr_y=None, db_peak=None):
+        """
+        Args:
+            y: Mono waveform
+            sr: Sample rate of y
+            center: False when y is already padded and framed by a FeatureStream
+            zcr_y: Edge-padded copy of y used for ZCR when center=False
+                (librosa pads ZCR frames with edge values, not zeros)
+            db_peak: Running log-mel peak of earlier blocks of the same stream,
+                so the 80 dB floor is relative to the loudest frame seen so far
+        """
+        self.y = y
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.center = center
+        self.zcr_y = y if zcr_y is None else zcr_y
+        self.db_peak = db_peak
+
+    @cached_property
+    def magnitude(self):
+        """|STFT| with librosa's default framing (centered, zero padded)"""
+        return np.abs(librosa.stft(self.y, n_fft=self.n_fft, hop_length=self.hop_length, center=self.center))
+
+    @cached_property
+    def power(self):
+        return self.magnitude ** 2
+
+    @cached_property
+    def mel_db(self):
+        """Log-power mel spectrogram, as used internally by librosa.feature.mfcc"""
+        mel = librosa.feature.melspectrogram(S=self.power, sr=self.sr)
+        if self.db_peak is None:
+            return librosa.power_to_db(mel)
+        log_mel = librosa.power_to_db(mel, top_db=None)
+        return np.maximum(log_mel, max(log_mel.max(), self.db_peak) - 80.0)
+
+    @cached_property
+    def rms(self):
+        """Frame RMS, shared by shimmer, energy entropy and SNR estimation"""
+        return librosa.feature.rms(y=self.y, frame_length=self.n_fft, hop_length=self.hop_length, center=self.center)[0]
+
+    @cached_property
+    def frame_energy(self):
+        return self.rms ** 2
+
+    @cached_property
+    def zcr(self):
+        return librosa.feature.zero_crossing_rate(self.zcr_y, frame_length=self.n_fft, hop_length=self.hop_length, center=self.center)[0]
+
+    @property
+    def n_frames(self):
+        if self.center:
+            return 1 + len(self.y) // self.hop_length
+        return max(0, 1 + (len(self.y) - self.n_fft) // self.hop_length)
+
+# The human profile was calibrated with librosa.pyin at its default sr (22050) on
+# 16 kHz audio, so F0 values are reported on that scale (x22050/16000). Every
+# pitch backend reports on the same scale to stay comparable with the profile.
+F0_REPORT_SR = 22050
+
+F0_BACKENDS = ("pyin", "yin")
+
+# Default search ranges in true Hz: pyin keeps the calibrated C2-C7 grid,
+# the fast YIN backend uses a speech-appropriate range. C2/C7 are MIDI 36/96,
+# spelled out to avoid importing librosa's notation module at load time
+def _midi_to_hz(note):
+    return 440.0 * 2.0 ** ((note - 69.0) / 12.0)
+
+PYIN_DEFAULT_RANGE = (_midi_to_hz(36) * 16000 / F0_REPORT_SR, _midi_to_hz(96) * 16000 / F0_REPORT_SR)
+SPEECH_F0_RANGE = (60.0, 600.0)
 
 class FeatureExtractor:
-    def __init__(self, sr=16000):
+    def __init__(self, sr=16000, f0_backend="pyin", fmin=None, fmax=None, yin_threshold=0.15):
+        """
+        Args:
+            sr: Analysis sample rate
+            f0_backend: "pyin" (probabilistic YIN + HMM, calibrated default)
+                or "yin" (vectorized frame-wise YIN, much faster)
+            fmin, fmax: Pitch search range in Hz (defaults depend on the backend)
+            yin_threshold: CMNDF trough threshold used for voicing by the "yin" backend
+        """
+        if f0_backend not in F0_BACKENDS:
+            raise ValueError(f"Unknown F0 backend: {f0_backend}")
         self.sr = sr
+        self.f0_backend = f0_backend
+        default_range = PYIN_DEFAULT_RANGE if f0_backend == "pyin" else SPEECH_F0_RANGE
+        self.fmin = default_range[0] if fmin is None else fmin
+        self.fmax = default_range[1] if fmax is None else fmax
+        self.yin_threshold = yin_threshold
+
+    def config_id(self):
+        """Identifier of every setting that changes extracted feature values"""
+        return f"sr={self.sr};f0={self.f0_backend};fmin={self.fmin:.4f};fmax={self.fmax:.4f};yin_threshold={self.yin_threshold}"
+
+    def _to_report_scale(self, hz):
+        return hz * F0_REPORT_SR / self.sr
+
+    def _yin(self, y, frame_length=2048, hop_length=512, center=True):
+        """
+        Frame-wise YIN over centered frames (aligned with the RMS frames).
+        Returns (f0, voiced_flag) with NaN F0 for unvoiced frames.
+        """
+        win_length = frame_length // 2
+        min_period = max(int(np.floor(self.sr / self.fmax)), 1)
+        max_period = min(int(np.ceil(self.sr / self.fmin)), frame_length - win_length - 1)
+
+        if center:
+            y = np.pad(y, frame_length // 2)
+        y_frames = librosa.util.frame(y, frame_length=frame_length, hop_length=hop_length)
+
+        # Difference function via FFT autocorrelation (as in librosa.yin)
+        a = np.fft.rfft(y_frames, frame_length, axis=0)
+        b = np.fft.rfft(y_frames[win_length:0:-1, :], frame_length, axis=0)
+        acf = np.fft.irfft(a * b, frame_length, axis=0)[win_length:, :]
+        acf[np.abs(acf) < 1e-6] = 0
+        energy = np.cumsum(y_frames ** 2, axis=0)
+        energy = energy[win_length:, :] - energy[:-win_length, :]
+        energy[np.abs(energy) < 1e-6] = 0
+        diff = energy[:1, :] + energy - 2 * acf
+
+        # Cumulative mean normalized difference over the allowed periods
+        cumulative_mean = np.cumsum(diff[1:max_period + 1, :], axis=0) / np.arange(1, max_period + 1)[:, None]
+        cmndf = diff[min_period:max_period + 1, :] / (cumulative_mean[min_period - 1:max_period, :] + 1e-12)
+
+        # First trough below the threshold; frames without one are unvoiced
+        is_trough = np.zeros_like(cmndf, dtype=bool)
+        is_trough[1:-1] = (cmndf[1:-1] < cmndf[:-2]) & (cmndf[1:-1] <= cmndf[2:])
+        candidates = is_trough & (cmndf < self.yin_threshold)
+        voiced_flag = candidates.any(axis=0)
+        idx = np.argmax(candidates, axis=0)
+
+        # Parabolic interpolation around the selected trough
+        cols = np.arange(cmndf.shape[1])
+        left = cmndf[np.maximum(idx - 1, 0), cols]
+        mid = cmndf[idx, cols]
+        right = cmndf[np.minimum(idx + 1, len(cmndf) - 1), cols]
+        curvature = left - 2 * mid + right
+        shift = np.where(np.abs(curvature) > 1e-12, 0.5 * (left - right) / np.where(curvature == 0, 1, curvature), 0)
+        period = min_period + idx + np.clip(shift, -1, 1)
+
+        f0 = np.where(voiced_flag, F0_REPORT_SR / period, np.nan)
+        return f0, voiced_flag
 
-    def extract_prosodic_features(self, y):
-        # F0 extraction using yin
-        f0, voiced_flag, voiced_probs = librosa.pyin(y, fmin=librosa.note_to_hz('C2'), fmax=librosa.note_to_hz('C7'))
+    def track_pitch(self, y, center=True):
+        """Return per-frame (f0, voiced_flag) from the configured backend"""
+        if self.f0_backend == "yin":
+            return self._yin(y, center=center)
+        f0, voiced_flag, _ = librosa.pyin(
+            y,
+            fmin=self._to_report_scale(self.fmin),
+            fmax=self._to_report_scale(self.fmax),
+            sr=F0_REPORT_SR,
+            center=center
+        )
+        return f0, voiced_flag
+
+    def extract_prosodic_features(self, y, analysis=None):
+        # F0 extraction using the configured pitch backend
+        f0, voiced_flag = self.track_pitch(y)
         valid_f0 = f0[~np.isnan(f0)]
         
         if len(valid_f0) < 2:
@@ -32,7 +270,9 @@ class FeatureExtractor:
         # Simple amplitude shimmer: mean absolute difference between peaks
         # Let's use the RMS energy over voiced segments as a proxy or find local peaks
         # Here we use RMS energy of the voiced frames
-        rms = librosa.feature.rms(y=y)[0]
+        if analysis is None:
+            analysis = ClipAnalysis(y, self.sr)
+        rms = analysis.rms
         voiced_rms = rms[voiced_flag > 0.5] if any(voiced_flag > 0.5) else []
         if len(voiced_rms) > 1:
             shimmer = np.mean(np.abs(np.diff(voiced_rms))) / np.mean(voiced_rms)
@@ -46,20 +286,35 @@ class FeatureExtractor:
             "shimmer": float(shimmer)
         }
 
-    def extract_spectral_features(self, y):
-        # MFCCs
-        mfccs = librosa.feature.mfcc(y=y, sr=self.sr, n_mfcc=13)
+    def spectral_frames(self, analysis):
+        """Per-frame spectral descriptors, all computed from the shared STFT"""
+        S = analysis.magnitude
+        return {
+            # MFCCs
+            "mfcc": librosa.feature.mfcc(S=analysis.mel_db, n_mfcc=13),
+            # Spectral Centroid
+            "centroid": librosa.feature.spectral_centroid(S=S, sr=self.sr)[0],
+            # Spectral Bandwidth
+            "bandwidth": librosa.feature.spectral_bandwidth(S=S, sr=self.sr)[0],
+            # Flatness
+            "flatness": librosa.feature.spectral_flatness(S=S)[0],
+            # Rolloff
+            "rolloff": librosa.feature.spectral_rolloff(S=S, sr=self.sr)[0]
+        }
+
+    def extract_spectral_features(self, y, analysis=None):
+        # All descriptors share a single STFT of the clip
+        if analysis is None:
+            analysis = ClipAnalysis(y, self.sr)
+        frames = self.spectral_frames(analysis)
+
+        mfccs = frames["mfcc"]
         mfcc_mean = np.mean(mfccs, axis=1)
         mfcc_std = np.std(mfccs, axis=1)
-        
-        # Spectral Centroid
-        centroid = librosa.feature.spectral_centroid(y=y, sr=self.sr)[0]
-        # Spectral Bandwidth
-        bandwidth = librosa.feature.spectral_bandwidth(y=y, sr=self.sr)[0]
-        # Flatness
-        flatness = librosa.feature.spectral_flatness(y=y)[0]
-        # Rolloff
-        rolloff = librosa.feature.spectral_rolloff(y=y, sr=self.sr)[0]
+        centroid = frames["centroid"]
+        bandwidth = frames["bandwidth"]
+        flatness = frames["flatness"]
+        rolloff = frames["rolloff"]
         
         return {
             "mfcc_mean": mfcc_mean.tolist(),
@@ -70,13 +325,16 @@ class FeatureExtractor:
             "rolloff_mean": float(np.mean(rolloff))
         }
 
-    def extract_temporal_features(self, y):
+    def extract_temporal_features(self, y, analysis=None):
+        from scipy.stats import entropy
+
+        if analysis is None:
+            analysis = ClipAnalysis(y, self.sr)
         # ZCR
-        zcr = librosa.feature.zero_crossing_rate(y)[0]
+        zcr = analysis.zcr
         # Energy Entropy
         # Split into frames and calculate entropy of energy
-        rms = librosa.feature.rms(y=y)[0]
-        energy = rms**2
+        energy = analysis.frame_energy
         if np.sum(energy) > 0:
             prob = energy / np.sum(energy)
             eng_entropy = entropy(prob)
@@ -90,64 +348,425 @@ class FeatureExtractor:
 
     def extract_all(self, file_path):
         y, _ = librosa.load(file_path, sr=self.sr)
+        return self.extract_from_array(y, self.sr)
+
+    def extract_streaming(self, source, block_seconds=30.0):
+        """
+        Extract features from an audio file (path or file object) block by block.
+
+        Memory stays constant in file length. Frame-local features match
+        extract_all; see FeatureStream for the pyin and MFCC floor caveats.
+        """
+        stream = FeatureStream(self)
+        with sf.SoundFile(source) as f:
+            native_sr = f.samplerate
+            resampler = soxr.ResampleStream(native_sr, self.sr, 1, dtype='float32', quality='HQ') if native_sr != self.sr else None
+            for block in f.blocks(blocksize=int(block_seconds * native_sr), dtype='float32', always_2d=True):
+                mono = block.mean(axis=1)
+                stream.push(resampler.resample_chunk(mono) if resampler is not None else mono)
+            if resampler is not None:
+                stream.push(resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True))
+        return stream.finish()
+
+    def extract_from_array(self, y, sr, analysis=None, timings=None):
+        """
+        Extract features from an already decoded mono waveform.
+
+        Pass a ClipAnalysis to reuse its frame statistics (RMS, ZCR, spectrograms)
+        after extraction; it must wrap the same waveform at self.sr. Seconds
+        spent per stage are added to `timings` when a dict is given.
+        """
+        if sr != self.sr:
+            with span(timings, "resample"):
+                y = librosa.resample(y, orig_sr=sr, target_sr=self.sr)
         if len(y) == 0:
              return None
              
+        if analysis is None:
+            analysis = ClipAnalysis(y, self.sr)
         features = {}
-        features.update(self.extract_spectral_features(y))
-        features.update(self.extract_prosodic_features(y))
-        features.update(self.extract_temporal_features(y))
+        with span(timings, "spectral"):
+            features.update(self.extract_spectral_features(y, analysis))
+        with span(timings, "pitch"):
+            features.update(self.extract_prosodic_features(y, analysis))
+        with span(timings, "temporal"):
+            features.update(self.extract_temporal_features(y, analysis))
         
         return features
 
-def main():
-    metadata_path = "e:/HCL/data/train_split.csv"
+    def extract_budgeted(self, y, sr, budget_seconds, segment_seconds=2.0, analysis=None, timings=None):
+        """
+        Extract features from at most `budget_seconds` of a long clip.
+
+        The segments are chosen on frame energy (see select_segments), each is
+        analyzed as a stretch of its own and the accumulators are merged, so
+        pitch differences are never taken across a cut. Clips within the
+        budget take the full extract_from_array path. `analysis` follows the
+        extract_from_array contract.
+        """
+        if sr != self.sr:
+            with span(timings, "resample"):
+                y = librosa.resample(y, orig_sr=sr, target_sr=self.sr)
+        if len(y) <= budget_seconds * self.sr:
+            return self.extract_from_array(y, self.sr, analysis, timings)
+
+        if analysis is None:
+            analysis = ClipAnalysis(y, self.sr)
+        with span(timings, "segment_select"):
+            segments = select_segments(
+                analysis.frame_energy, analysis.hop_length,
+                int(budget_seconds * self.sr), int(segment_seconds * self.sr), len(y)
+            )
+
+        accumulator = FeatureAccumulator()
+        with span(timings, "segments"):
+            for start, end in segments:
+                stream = FeatureStream(self)
+                stream.push(y[start:end])
+                stream.finish()
+                accumulator.merge(stream.accumulator, contiguous=False)
+        return accumulator.finalize()
+
+class SequenceStats:
+    """
+    Running count/mean/M2 and summed absolute first differences of a value
+    sequence (Chan et al. parallel update), mergeable in time order.
+    """
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.abs_diff_sum = 0.0
+        self.first = None
+        self.last = None
+        self.gaps = 0  # joins between non-contiguous pieces (no difference taken)
+
+    @classmethod
+    def from_values(cls, values):
+        stats = cls()
+        values = np.asarray(values, dtype=float)
+        if len(values):
+            stats.n = len(values)
+            stats.mean = float(np.mean(values))
+            stats.m2 = float(np.sum((values - stats.mean) ** 2))
+            stats.abs_diff_sum = float(np.sum(np.abs(np.diff(values))))
+            stats.first = float(values[0])
+            stats.last = float(values[-1])
+        return stats
+
+    def update(self, values):
+        self.merge(SequenceStats.from_values(values))
+
+    def merge(self, other, contiguous=True):
+        """
+        Append the statistics of a sequence that follows this one; with
+        contiguous=False no difference is taken across the join.
+        """
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.__dict__.update(other.__dict__)
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta ** 2 * self.n * other.n / n
+        self.mean += delta * other.n / n
+        self.abs_diff_sum += other.abs_diff_sum
+        if contiguous:
+            self.abs_diff_sum += abs(other.first - self.last)
+        else:
+            self.gaps += 1
+        self.gaps += other.gaps
+        self.n = n
+        self.last = other.last
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.m2 / self.n)) if self.n else 0.0
+
+    @property
+    def mean_abs_diff(self):
+        n_diffs = self.n - 1 - self.gaps
+        return self.abs_diff_sum / n_diffs if n_diffs > 0 else 0.0
+
+class FeatureAccumulator:
+    """
+    Mergeable running sums behind every clip-level feature. Accumulators of
+    consecutive stretches of audio merge into the accumulator of the whole.
+    """
+    def __init__(self, n_mfcc=13, keep_frame_energy=False):
+        """
+        Args:
+            keep_frame_energy: Also keep the per-frame energies (for SNR estimation);
+                off by default so memory stays constant in stream length
+        """
+        self.n_frames = 0
+        self.mfcc_mean = np.zeros(n_mfcc)
+        self.mfcc_m2 = np.zeros(n_mfcc)
+        self.sums = {"centroid": 0.0, "bandwidth": 0.0, "flatness": 0.0, "rolloff": 0.0, "zcr": 0.0}
+        # Energy entropy = log(S) - T / S with S = sum(e), T = sum(e * log(e))
+        self.energy_sum = 0.0
+        self.energy_xlogx = 0.0
+        self.frame_energy = [] if keep_frame_energy else None
+        self.f0 = SequenceStats()
+        self.periods = SequenceStats()
+        self.voiced_rms = SequenceStats()
+
+    def update(self, spectral, rms, zcr, f0, voiced_flag):
+        """Add a block of frames (spectral_frames output plus frame RMS, ZCR and pitch)"""
+        mfcc = spectral["mfcc"].astype(float)
+        n_block = mfcc.shape[1]
+        if n_block == 0:
+            return
+        block_mean = mfcc.mean(axis=1)
+        block_m2 = np.sum((mfcc - block_mean[:, None]) ** 2, axis=1)
+        n = self.n_frames + n_block
+        delta = block_mean - self.mfcc_mean
+        self.mfcc_m2 += block_m2 + delta ** 2 * self.n_frames * n_block / n
+        self.mfcc_mean += delta * n_block / n
+        self.n_frames = n
+
+        for key in ("centroid", "bandwidth", "flatness", "rolloff"):
+            self.sums[key] += float(np.sum(spectral[key], dtype=float))
+        self.sums["zcr"] += float(np.sum(zcr, dtype=float))
+
+        energy = np.asarray(rms, dtype=float) ** 2
+        self.energy_sum += float(np.sum(energy))
+        self.energy_xlogx += float(np.sum(energy[energy > 0] * np.log(energy[energy > 0])))
+        if self.frame_energy is not None:
+            self.frame_energy.append(energy)
+
+        valid_f0 = f0[~np.isnan(f0)]
+        self.f0.update(valid_f0)
+        self.periods.update(1.0 / valid_f0)
+        self.voiced_rms.update(np.asarray(rms)[np.asarray(voiced_flag) > 0.5])
+
+    def merge(self, other, contiguous=True):
+        """
+        Append an accumulator covering the audio directly after this one
+        (contiguous=False for a later, non-adjacent stretch)
+        """
+        if other.n_frames:
+            n = self.n_frames + other.n_frames
+            delta = other.mfcc_mean - self.mfcc_mean
+            self.mfcc_m2 += other.mfcc_m2 + delta ** 2 * self.n_frames * other.n_frames / n
+            self.mfcc_mean += delta * other.n_frames / n
+            self.n_frames = n
+        for key in self.sums:
+            self.sums[key] += other.sums[key]
+        self.energy_sum += other.energy_sum
+        self.energy_xlogx += other.energy_xlogx
+        if self.frame_energy is not None and other.frame_energy is not None:
+            self.frame_energy.extend(other.frame_energy)
+        self.f0.merge(other.f0, contiguous)
+        self.periods.merge(other.periods, contiguous)
+        self.voiced_rms.merge(other.voiced_rms, contiguous)
+        return self
+
+    def finalize(self):
+        """Clip-level features in the same layout as FeatureExtractor.extract_from_array"""
+        if self.n_frames == 0:
+            return None
+        n = self.n_frames
+        features = {
+            "mfcc_mean": self.mfcc_mean.tolist(),
+            "mfcc_std": np.sqrt(self.mfcc_m2 / n).tolist(),
+            "centroid_mean": self.sums["centroid"] / n,
+            "bandwidth_mean": self.sums["bandwidth"] / n,
+            "flatness_mean": self.sums["flatness"] / n,
+            "rolloff_mean": self.sums["rolloff"] / n
+        }
+
+        if self.f0.n < 2:
+            features.update({"f0_mean": 0, "f0_std": 0, "jitter": 0, "shimmer": 0})
+        else:
+            shimmer = self.voiced_rms.mean_abs_diff / self.voiced_rms.mean if self.voiced_rms.n > 1 else 0
+            features.update({
+                "f0_mean": self.f0.mean,
+                "f0_std": self.f0.std,
+                "jitter": self.periods.mean_abs_diff / self.periods.mean,
+                "shimmer": float(shimmer)
+            })
+
+        if self.energy_sum > 0:
+            eng_entropy = np.log(self.energy_sum) - self.energy_xlogx / self.energy_sum
+        else:
+            eng_entropy = 0
+        features.update({
+            "zcr_mean": self.sums["zcr"] / n,
+            "energy_entropy": float(eng_entropy)
+        })
+        return features
+
+class FeatureStream:
+    """
+    Incremental feature extraction over a stream of samples at extractor.sr.
+
+    Frames are cut exactly like the one-shot path (n_fft//2 padding at both
+    ends, hop_length apart), so frame-local features (spectral shape, RMS,
+    ZCR, YIN pitch) are identical and only the clip-level reduction is
+    incremental. Two stages are not strictly frame-local: pyin's Viterbi
+    smoothing runs per block, and the MFCC 80 dB floor is relative to the
+    loudest frame seen so far rather than in the whole clip.
+    """
+    def __init__(self, extractor, block_frames=512, n_fft=2048, hop_length=512, keep_frame_energy=False):
+        self.extractor = extractor
+        self.keep_frame_energy = keep_frame_energy
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.block_frames = block_frames
+        self.accumulator = FeatureAccumulator(keep_frame_energy=keep_frame_energy)
+        self.n_samples = 0
+        self._buffer = np.zeros(n_fft // 2, dtype=np.float32)  # leading zero padding
+        self._zcr_buffer = None  # edge padded, filled once the first sample is known
+        self._db_peak = -np.inf
+
+    def push(self, samples):
+        samples = np.asarray(samples, dtype=np.float32)
+        if len(samples) == 0:
+            return
+        if self._zcr_buffer is None:
+            self._zcr_buffer = np.full(self.n_fft // 2, samples[0], dtype=np.float32)
+        self._buffer = np.concatenate([self._buffer, samples])
+        self._zcr_buffer = np.concatenate([self._zcr_buffer, samples])
+        self.n_samples += len(samples)
+        if len(self._buffer) >= self.n_fft + (self.block_frames - 1) * self.hop_length:
+            self._process()
+
+    def take(self):
+        """Hand over the frames processed so far and start a fresh accumulator"""
+        self._process()
+        accumulator, self.accumulator = self.accumulator, FeatureAccumulator(keep_frame_energy=self.keep_frame_energy)
+        return accumulator
+
+    def finish(self):
+        """Flush the trailing padding and return clip-level features (None if empty)"""
+        if self._zcr_buffer is None:
+            return None
+        pad = self.n_fft // 2
+        self._buffer = np.concatenate([self._buffer, np.zeros(pad, dtype=np.float32)])
+        self._zcr_buffer = np.concatenate([self._zcr_buffer, np.full(pad, self._zcr_buffer[-1], dtype=np.float32)])
+        self._process()
+        self._buffer = self._buffer[:0]
+        return self.accumulator.finalize()
+
+    def _process(self):
+        if len(self._buffer) < self.n_fft:
+            return
+        n_frames = 1 + (len(self._buffer) - self.n_fft) // self.hop_length
+        end = (n_frames - 1) * self.hop_length + self.n_fft
+
+        analysis = ClipAnalysis(
+            self._buffer[:end], self.extractor.sr,
+            n_fft=self.n_fft, hop_length=self.hop_length, center=False,
+            zcr_y=self._zcr_buffer[:end], db_peak=self._db_peak
+        )
+        spectral = self.extractor.spectral_frames(analysis)
+        self._db_peak = max(self._db_peak, float(analysis.mel_db.max()))
+        f0, voiced_flag = self.extractor.track_pitch(analysis.y, center=False)
+        self.accumulator.update(spectral, analysis.rms, analysis.zcr, f0, voiced_flag)
+
+        # Keep the overlap needed by the next frame
+        consumed = n_frames * self.hop_length
+        self._buffer = self._buffer[consumed:]
+        self._zcr_buffer = self._zcr_buffer[consumed:]
+
+# Parallel corpus extraction: one FeatureExtractor per worker process
+_worker_extractor = None
+
+def _init_extraction_worker(extractor):
+    global _worker_extractor
+    _worker_extractor = extractor
+
+def _extract_file(file_path):
+    """Worker task: (flat features or None, error message or None)"""
+    try:
+        feat = _worker_extractor.extract_all(file_path)
+        return (flatten_features(feat) if feat else None), None
+    except Exception as e:
+        return None, str(e)
+
+def extract_corpus(file_paths, extractor, workers=None, chunksize=4):
+    """
+    Extract features for many files across a process pool.
+
+    Yields (flat features or None, error or None) in input order, so the
+    caller can stop early and keep what has been collected.
+    """
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_extraction_worker, initargs=(extractor,))
+    try:
+        yield from executor.map(_extract_file, file_paths, chunksize=chunksize)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def main(metadata_path="e:/HCL/data/train_split.csv"):
+    """
+    Profile the clips of a manifest. Each manifest is saved as its own
+    mergeable profile shard, so new human data can be added as a new manifest
+    without reprocessing the old ones.
+    """
+    import pandas as pd
+    from tqdm import tqdm
+    try:
+        from .feature_store import FeatureStore
+        from .profile_builder import ProfileAccumulator, build_profile
+    except ImportError:
+        from feature_store import FeatureStore
+        from profile_builder import ProfileAccumulator, build_profile
+
     if not os.path.exists(metadata_path):
         print("Metadata not found. Run Milestone 1 first.")
         return
         
     df = pd.read_csv(metadata_path)
     extractor = FeatureExtractor(sr=16000)
+    store = FeatureStore("e:/HCL/data/feature_store", extractor.config_id())
     
-    all_features = []
+    shard_dir = "e:/HCL/reports/profile_shards"
+    shard_name = os.path.splitext(os.path.basename(metadata_path))[0]
+    accumulator = ProfileAccumulator()
     
-    # Let's process a subset for profiling if it's too many, 
-    # but 400 samples (80% of 500) is fine.
-    # Limit samples for speed during milestone demo
-    df = df.sample(min(50, len(df)), random_state=42)
+    # Clips already in the feature store are reused; the rest are sharded
+    # across all cores
+    to_extract = []
+    for idx, row in df.iterrows():
+        file_path = os.path.join("e:/HCL", row['file_path'])
+        cached = store.get(file_path)
+        if cached:
+            accumulator.update(cached['features'])
+        else:
+            to_extract.append((file_path, row))
     
-    for idx, row in tqdm(df.iterrows(), total=len(df), desc="Extracting features"):
-        try:
-            file_path = os.path.join("e:/HCL", row['file_path'])
-            feat = extractor.extract_all(file_path)
-            if feat:
-                # Flatten MFCCs
-                flat_feat = {}
-                for k, v in feat.items():
-                    if isinstance(v, list):
-                        for i, val in enumerate(v):
-                            flat_feat[f"{k}_{i}"] = val
-                    else:
-                        flat_feat[k] = v
-                all_features.append(flat_feat)
-        except KeyboardInterrupt:
-            print("Interrupted. Saving partial results...")
-            break
-        except Exception as e:
-            print(f"Error processing {row['file_path']}: {e}")
-            continue
+    start = time.perf_counter()
+    extracted = 0
+    results = extract_corpus([file_path for file_path, _ in to_extract], extractor)
+    try:
+        for (file_path, row), (flat_feat, error) in tqdm(zip(to_extract, results), total=len(to_extract), desc="Extracting features"):
+            if error:
+                print(f"Error processing {row['file_path']}: {error}")
+                continue
+            if flat_feat:
+                store.put(file_path, flat_feat, duration_sec=row.get('duration_sec'))
+                accumulator.update(flat_feat)
+                extracted += 1
+    except KeyboardInterrupt:
+        print("Interrupted. Saving partial results...")
+    finally:
+        results.close()
+    elapsed = time.perf_counter() - start
+    store.flush()
+    print(f"Feature store: {store.hits} reused, {extracted} extracted")
+    if extracted:
+        print(f"Throughput: {extracted / elapsed:.2f} clips/sec ({elapsed:.1f}s)")
             
-    feat_df = pd.DataFrame(all_features)
+    if accumulator.columns is None:
+        print("No features extracted. Profile not updated.")
+        return
     
-    # Calculate Profile Statistics
-    profile = {
-        "mean": feat_df.mean().to_dict(),
-        "std": feat_df.std().to_dict(),
-        "min": feat_df.min().to_dict(),
-        "max": feat_df.max().to_dict(),
-        "q1": feat_df.quantile(0.25).to_dict(),
-        "q3": feat_df.quantile(0.75).to_dict()
-    }
+    # Calculate Profile Statistics across every manifest profiled so far
+    os.makedirs(shard_dir, exist_ok=True)
+    accumulator.save(os.path.join(shard_dir, f"{shard_name}.json"))
+    profile = build_profile(shard_dir)
     
     # Save Profile
     os.makedirs("e:/HCL/reports", exist_ok=True)
@@ -157,4 +776,5 @@ def main():
     print("Milestone 2: Human Speech Profile generated.")
 
 if __name__ == "__main__":
-    main()
+    import sys
+    main(*sys.argv[1:2])
@@ -0,0 +1,128 @@
+"""
+Persistent on-disk feature store for the offline pipelines.
+Flattened feature vectors live in append-only .npy shards (memory-mapped on
+read) with a CSV index keyed by file path, mtime, size and extractor config,
+so unchanged audio is never re-extracted.
+"""
+import os
+import json
+import numpy as np
+import pandas as pd
+
+INDEX_COLUMNS = ["path", "mtime_ns", "size", "config", "shard", "row", "duration_sec"]
+
+class FeatureStore:
+    def __init__(self, root_dir, config_id):
+        """
+        Args:
+            root_dir: Directory holding index.csv, columns.json and the shards
+            config_id: FeatureExtractor.config_id(); entries from other configs are ignored
+        """
+        self.root_dir = root_dir
+        self.config_id = config_id
+        self.index_path = os.path.join(root_dir, "index.csv")
+        self.columns_path = os.path.join(root_dir, "columns.json")
+        os.makedirs(root_dir, exist_ok=True)
+
+        self.columns = None
+        if os.path.exists(self.columns_path):
+            with open(self.columns_path, 'r') as f:
+                self.columns = json.load(f)
+
+        # Latest entry per path for this config (later rows supersede earlier ones)
+        self._index = {}
+        if os.path.exists(self.index_path):
+            index_df = pd.read_csv(self.index_path)
+            index_df = index_df[index_df['config'] == config_id]
+            for entry in index_df.to_dict('records'):
+                self._index[entry['path']] = entry
+
+        self._shards = {}
+        self._pending = []
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path):
+        return os.path.normpath(path)
+
+    def _shard(self, name):
+        if name not in self._shards:
+            self._shards[name] = np.load(os.path.join(self.root_dir, name), mmap_mode='r')
+        return self._shards[name]
+
+    def get(self, path):
+        """
+        Return {"features": flat dict, "duration_sec": float or None} for an
+        unchanged file, or None if it was never stored or has been modified.
+        """
+        key = self._key(path)
+        entry = self._index.get(key)
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if entry is None or st is None or entry['mtime_ns'] != st.st_mtime_ns or entry['size'] != st.st_size:
+            self.misses += 1
+            return None
+
+        if entry['shard'] is None:
+            vector = entry['vector']
+        else:
+            vector = self._shard(entry['shard'])[int(entry['row'])]
+        self.hits += 1
+        duration = entry.get('duration_sec')
+        return {
+            "features": dict(zip(self.columns, np.asarray(vector, dtype=float).tolist())),
+            "duration_sec": None if duration is None or pd.isna(duration) else float(duration)
+        }
+
+    def put(self, path, flat_features, duration_sec=None):
+        """Stage features for a file; they are readable at once and persisted on flush()"""
+        if self.columns is None:
+            self.columns = list(flat_features.keys())
+        elif list(flat_features.keys()) != self.columns:
+            raise ValueError("Feature layout differs from the store's columns")
+
+        st = os.stat(path)
+        entry = {
+            "path": self._key(path),
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "config": self.config_id,
+            "shard": None,
+            "row": len(self._pending),
+            "duration_sec": duration_sec,
+            "vector": np.array([flat_features[c] for c in self.columns], dtype=float)
+        }
+        self._pending.append(entry)
+        self._index[entry['path']] = entry
+
+    def flush(self):
+        """Write staged entries as a new shard and append them to the index"""
+        if not self._pending:
+            return
+        if not os.path.exists(self.columns_path):
+            with open(self.columns_path, 'w') as f:
+                json.dump(self.columns, f, indent=4)
+
+        n_shards = len([name for name in os.listdir(self.root_dir) if name.startswith("shard_")])
+        shard_name = f"shard_{n_shards:05d}.npy"
+        np.save(os.path.join(self.root_dir, shard_name), np.stack([entry['vector'] for entry in self._pending]))
+
+        for entry in self._pending:
+            entry['shard'] = shard_name
+            del entry['vector']
+        pd.DataFrame(self._pending, columns=INDEX_COLUMNS).to_csv(
+            self.index_path, mode='a', header=not os.path.exists(self.index_path), index=False
+        )
+        self._pending = []
+
+    def __len__(self):
+        return len(self._index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
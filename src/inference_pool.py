@@ -0,0 +1,195 @@
+"""
+Bounded worker pool for the CPU-bound detection pipeline.
+Keeps decode/feature extraction/scoring off the asyncio event loop and
+rejects new work once the admission queue is full.
+"""
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+def _noop():
+    return None
+
+
+def _initialize_worker(initializer, ready):
+    """Run the user initializer, then report this worker as ready"""
+    if initializer is not None:
+        initializer()
+    ready.put((os.getpid(), threading.get_ident()))
+
+
+class PoolSaturated(Exception):
+    """Raised when the pool has no free admission slots"""
+
+    def __init__(self, retry_after):
+        super().__init__("Inference pool is saturated")
+        self.retry_after = retry_after
+
+
+class Reservation:
+    """
+    Admission slots held by one request. The slots are freed once the
+    request has closed the reservation and every job it submitted has
+    finished, so a request cancelled mid-job (e.g. on client disconnect)
+    keeps counting against the pool until its job really ends.
+    """
+
+    def __init__(self, pool, slots):
+        pool._admit(slots)
+        self.pool = pool
+        self.slots = slots
+        self._holders = 1  # the request itself, until close()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _hold(self):
+        with self._lock:
+            self._holders += 1
+
+    def _drop(self, _future=None):
+        # Also called from executor threads by the job futures' done-callbacks
+        with self._lock:
+            self._holders -= 1
+            last = self._holders == 0
+        if last:
+            self.pool._release(self.slots)
+
+    def submit(self, fn, *args):
+        """Submit fn(*args) to the executor under this reservation"""
+        self._hold()
+        try:
+            future = self.pool.executor.submit(fn, *args)
+        except BaseException:
+            self._drop()
+            raise
+        future.add_done_callback(self._drop)
+        return future
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._drop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class InferencePool:
+    def __init__(self, workers=None, queue_size=None, mode="thread", retry_after=1, initializer=None):
+        """
+        Args:
+            workers: Number of executor workers (defaults to the CPU count)
+            queue_size: Jobs allowed to wait for a free worker before rejecting
+            mode: "thread" or "process"
+            retry_after: Seconds suggested to clients when the pool is full
+            initializer: Called once in each worker before it takes jobs
+        """
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown executor mode: {mode}")
+
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = self.workers * 2 if queue_size is None else queue_size
+        self.capacity = self.workers + self.queue_size
+        self.mode = mode
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()  # slots are released from executor threads
+        self._initializer = initializer
+        self._executor = None
+        self._ready = None  # workers report on it once their initializer has run
+
+    @property
+    def executor(self):
+        # Created on first use, so the app can be imported in a pre-fork
+        # parent (see serve.py) without its workers sharing executor pipes
+        if self._executor is None:
+            if self.mode == "process":
+                context = multiprocessing.get_context()
+                self._ready = context.Queue()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=context,
+                    initializer=_initialize_worker, initargs=(self._initializer, self._ready)
+                )
+            else:
+                self._ready = queue.Queue()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="inference",
+                    initializer=_initialize_worker, initargs=(self._initializer, self._ready)
+                )
+        return self._executor
+
+    def _admit(self, slots):
+        with self._lock:
+            if self.in_flight + slots > self.capacity:
+                self.rejected += 1
+                raise PoolSaturated(self.retry_after)
+            self.in_flight += slots
+
+    def _release(self, slots):
+        with self._lock:
+            self.in_flight -= slots
+
+    def reserve(self, slots=1):
+        """Take admission slots now for jobs submitted later (raises PoolSaturated)"""
+        return Reservation(self, slots)
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on a worker, raising PoolSaturated if the queue is full"""
+        with self.reserve() as reservation:
+            return await reservation.run(fn, *args)
+
+    async def map(self, fn, items):
+        """
+        Fan fn(item) out across the workers for every item.
+
+        A batch takes at most `capacity` admission slots so oversized batches
+        are still admitted on an idle pool. Results are returned in input order,
+        with the exception in place of the result for items that failed.
+        """
+        with self.reserve(min(len(items), self.capacity)) as reservation:
+            futures = [asyncio.wrap_future(reservation.submit(fn, item)) for item in items]
+            return await asyncio.gather(*futures, return_exceptions=True)
+
+    async def start_workers(self):
+        """
+        Start every worker now instead of on the first jobs (executors spawn
+        workers lazily) and return once each one has run the initializer.
+        The start-up jobs only make the executor spawn its workers: one fast
+        worker may run several of them, so readiness is counted from the
+        reports each worker sends after its initializer.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        await asyncio.gather(*(loop.run_in_executor(executor, _noop) for _ in range(self.workers)))
+        ready = set()
+        while len(ready) < self.workers:
+            try:
+                ready.add(await loop.run_in_executor(None, self._ready.get, True, 1.0))
+            except queue.Empty:
+                # Raises BrokenProcessPool if a worker died in its initializer
+                executor.submit(_noop)
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
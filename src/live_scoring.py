@@ -0,0 +1,130 @@
+"""
+Sliding-window live scoring for streamed PCM audio.
+Each hop of new audio is analyzed once; the window features are merged from
+the per-hop accumulators, so per-window cost does not grow with call length.
+"""
+from collections import deque
+import numpy as np
+
+try:
+    from .feature_engineering import FeatureAccumulator, FeatureStream, flatten_features
+    from .signal_quality import estimate_snr
+except ImportError:
+    from feature_engineering import FeatureAccumulator, FeatureStream, flatten_features
+    from signal_quality import estimate_snr
+
+PCM_ENCODINGS = {"pcm_s16le": 2, "f32le": 4}  # encoding -> bytes per sample
+
+def decode_pcm(payload, encoding="pcm_s16le"):
+    """
+    Convert raw little-endian mono PCM bytes to float32 samples. A trailing
+    partial sample is ignored; LiveSession.decode carries it over instead.
+    """
+    if encoding == "pcm_s16le":
+        usable = len(payload) - len(payload) % 2
+        return np.frombuffer(payload[:usable], dtype='<i2').astype(np.float32) / 32768.0
+    if encoding == "f32le":
+        usable = len(payload) - len(payload) % 4
+        return np.frombuffer(payload[:usable], dtype='<f4').astype(np.float32)
+    raise ValueError(f"Unsupported PCM encoding: {encoding}")
+
+class LiveSession:
+    def __init__(self, extractor, window_seconds=10.0, hop_seconds=2.0, encoding="pcm_s16le"):
+        """
+        Args:
+            extractor: FeatureExtractor used for every hop (samples arrive at extractor.sr)
+            window_seconds: Length of audio each verdict covers
+            hop_seconds: Interval between verdicts
+            encoding: PCM encoding of the payloads passed to decode()
+        """
+        if encoding not in PCM_ENCODINGS:
+            raise ValueError(f"Unsupported PCM encoding: {encoding}")
+        if not 0 < hop_seconds <= window_seconds:
+            raise ValueError("hop_seconds must be positive and no longer than window_seconds")
+        self.extractor = extractor
+        self.encoding = encoding
+        self.sr = extractor.sr
+        self.hop_samples = int(round(hop_seconds * self.sr))
+        self.max_pending = int(round(window_seconds * self.sr))
+        self.stream = FeatureStream(extractor, keep_frame_energy=True)
+        # (accumulator, n_samples) for the most recent hops inside the window
+        self.hops = deque(maxlen=max(1, int(round(window_seconds / hop_seconds))))
+        self.samples_analyzed = 0
+        self.samples_dropped = 0
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._partial = b""  # bytes of a sample split across messages
+
+    def decode(self, payload):
+        """
+        Decode one message of PCM bytes. Messages may split a sample; its
+        leading bytes are kept and prepended to the next payload.
+        """
+        payload = self._partial + payload
+        usable = len(payload) - len(payload) % PCM_ENCODINGS[self.encoding]
+        self._partial = payload[usable:]
+        return decode_pcm(payload[:usable], self.encoding)
+
+    def feed(self, samples):
+        """Queue incoming samples (at extractor.sr)"""
+        samples = np.asarray(samples, dtype=np.float32)
+        self._pending = np.concatenate([self._pending, samples])
+
+    def pop_hop(self):
+        """Take the next full hop of queued samples, or None"""
+        if len(self._pending) < self.hop_samples:
+            return None
+        hop, self._pending = self._pending[:self.hop_samples], self._pending[self.hop_samples:]
+        return hop
+
+    def unpop_hop(self, hop):
+        """
+        Put a hop back at the front of the queue when no worker was free.
+        Returns the number of samples dropped: a client that outpaces the
+        workers loses its oldest backlog past one window rather than growing
+        it without bound, and the feature stream restarts cleanly.
+        """
+        self._pending = np.concatenate([hop, self._pending])
+        overflow = len(self._pending) - self.max_pending
+        if overflow <= 0:
+            return 0
+        self._pending = self._pending[overflow:]
+        self.samples_dropped += overflow
+        self.stream = FeatureStream(self.extractor, keep_frame_energy=True)
+        self.hops.clear()
+        return overflow
+
+    def advance(self, hop):
+        """
+        Analyze one hop and return the window's clip record
+        ({"features", "snr", "duration"}), or None while the window is empty.
+        """
+        self.stream.push(hop)
+        self.hops.append((self.stream.take(), len(hop)))
+        self.samples_analyzed += len(hop)
+
+        window = FeatureAccumulator(keep_frame_energy=True)
+        for accumulator, _ in self.hops:
+            window.merge(accumulator)
+        features = window.finalize()
+        if not features:
+            return None
+
+        return {
+            "features": flatten_features(features),
+            "snr": estimate_snr(np.concatenate(window.frame_energy)),
+            "duration": sum(n for _, n in self.hops) / self.sr
+        }
+
+    @property
+    def window_end(self):
+        """Seconds of received audio up to the end of the window (dropped audio included)"""
+        return (self.samples_analyzed + self.samples_dropped) / self.sr
+
+    @property
+    def window_start(self):
+        return self.window_end - sum(n for _, n in self.hops) / self.sr
+
+def advance_session(session, hop):
+    """Pool entry point: returns the (possibly copied) session with its window record"""
+    clip = session.advance(hop)
+    return session, clip
@@ -0,0 +1,123 @@
+"""
+In-process latency histograms and counters, rendered in the Prometheus text
+exposition format. Pipeline stages record into plain dicts of seconds, which
+pickle cleanly back from process-pool workers.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Seconds; sized for per-stage work from a few ms up to long uploads
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Stage timings of the HTTP request being handled (None outside a request)
+request_timings = ContextVar("request_timings", default=None)
+
+@contextmanager
+def span(timings, stage):
+    """Add the time spent in the block to timings[stage] (no-op if timings is None)"""
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+def merge_timings(target, timings):
+    """Add one timings dict into another (no-op if either is None)"""
+    if target is None or not timings:
+        return
+    for stage, seconds in timings.items():
+        target[stage] = target.get(stage, 0.0) + seconds
+
+def server_timing_header(timings):
+    """Format stage timings as a Server-Timing header value (milliseconds)"""
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+class Metrics:
+    def __init__(self, prefix="voice_detect"):
+        self.prefix = prefix
+        self._meta = {}  # name -> (type, help)
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, help_text):
+        self._meta[f"{self.prefix}_{name}"] = (kind, help_text)
+
+    def inc(self, name, value=1.0, **labels):
+        key = (f"{self.prefix}_{name}", tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name, value, **labels):
+        key = (f"{self.prefix}_{name}", tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def observe_stages(self, timings):
+        for stage, seconds in timings.items():
+            self.observe("stage_duration_seconds", seconds, stage=stage)
+
+    def render(self, gauges=()):
+        """
+        Prometheus text format. `gauges` are (name, type, help, value) values
+        sampled at scrape time (e.g. cache and pool state).
+        """
+        lines = []
+        described = set()
+
+        def header(name, default_kind):
+            if name not in described:
+                kind, help_text = self._meta.get(name, (default_kind, ""))
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                described.add(name)
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                header(name, "counter")
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+            for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                header(name, "histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        for name, kind, help_text, value in gauges:
+            name = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
@@ -4,7 +4,8 @@ import numpy as np
 import json
 from tqdm import tqdm
 import matplotlib.pyplot as plt
-from feature_engineering import FeatureExtractor
+from feature_engineering import FeatureExtractor, flatten_features
+from feature_store import FeatureStore
 from anomaly_detection import AnomalyScorer
 
 def run_validation():
@@ -21,6 +22,7 @@ def run_validation():
     
     extractor = FeatureExtractor(sr=16000)
     scorer = AnomalyScorer(profile_path)
+    store = FeatureStore("e:/HCL/data/feature_store", extractor.config_id())
     
     validation_results = []
     anomaly_scores = []
@@ -28,19 +30,16 @@ def run_validation():
     for idx, row in tqdm(df_test.iterrows(), total=len(df_test), desc="Validating Human Samples"):
         file_path = os.path.join("e:/HCL", row['file_path'])
         
-        # 1. Feature Extraction
-        feat = extractor.extract_all(file_path)
-        if not feat:
-            continue
-            
-        # Flatten features
-        flat_feat = {}
-        for k, v in feat.items():
-            if isinstance(v, list):
-                for i, val in enumerate(v):
-                    flat_feat[f"{k}_{i}"] = val
-            else:
-                flat_feat[k] = v
+        # 1. Feature Extraction (reused from the feature store when unchanged)
+        cached = store.get(file_path)
+        if cached:
+            flat_feat = cached['features']
+        else:
+            feat = extractor.extract_all(file_path)
+            if not feat:
+                continue
+            flat_feat = flatten_features(feat)
+            store.put(file_path, flat_feat, duration_sec=row.get('duration_sec'))
         
         # 2. Anomaly Scoring
         score, reliability = scorer.score(flat_feat, snr=row.get('snr_db'), duration=row.get('duration_sec'))
@@ -55,6 +54,8 @@ def run_validation():
             "duration_sec": row.get('duration_sec')
         })
         
+    store.flush()
+    print(f"Feature store: {store.hits} reused, {store.misses} extracted")
     val_df = pd.DataFrame(validation_results)
     
     # 3. Threshold Calibration (95th percentile of human scores)
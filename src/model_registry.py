@@ -0,0 +1,129 @@
+"""
+Versioned in-memory registry of the calibrated profile and thresholds.
+A reload builds a complete new snapshot off to the side and swaps it in with
+a single reference assignment, so in-flight requests finish on the snapshot
+they started with and new requests never see a half-loaded model.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+
+try:
+    from .anomaly_detection import AnomalyScorer
+    from .decision_engine import DecisionEngine
+except ImportError:
+    from anomaly_detection import AnomalyScorer
+    from decision_engine import DecisionEngine
+
+class ModelSnapshot:
+    """Immutable bundle of everything a verdict depends on"""
+    def __init__(self, scorer, engine, thresholds, version, signature):
+        self.scorer = scorer
+        self.engine = engine
+        self.thresholds = thresholds
+        self.version = version
+        self.signature = signature  # (mtime_ns, size) of each source file
+        self.loaded_at = time.time()
+
+class ModelRegistry:
+    def __init__(self, profile_path, thresholds_path, config_id=""):
+        """
+        Args:
+            profile_path: human_feature_profile.json
+            thresholds_path: human_anomaly_thresholds.json
+            config_id: Extractor settings, folded into the version digest
+        """
+        self.profile_path = profile_path
+        self.thresholds_path = thresholds_path
+        self.config_id = config_id
+        self.reloads = 0
+        self.last_error = None
+        self._failed_signature = None  # files that failed to load; not retried until they change
+        self._lock = threading.Lock()  # one reload at a time
+        self.current = self._load()
+        self._seen_signature = self.current.signature  # files last loaded, even if unchanged in content
+
+    def _signature(self):
+        signature = []
+        for path in (self.profile_path, self.thresholds_path):
+            st = os.stat(path)
+            signature.append((st.st_mtime_ns, st.st_size))
+        return tuple(signature)
+
+    def _load(self):
+        signature = self._signature()
+        with open(self.profile_path, 'rb') as f:
+            profile_bytes = f.read()
+        with open(self.thresholds_path, 'rb') as f:
+            thresholds_bytes = f.read()
+
+        # The version is a digest of exactly the bytes that were parsed
+        digest = hashlib.sha256(self.config_id.encode())
+        digest.update(profile_bytes)
+        digest.update(thresholds_bytes)
+
+        thresholds = json.loads(thresholds_bytes)
+        return ModelSnapshot(
+            scorer=AnomalyScorer.from_profile(json.loads(profile_bytes)),
+            engine=DecisionEngine.from_thresholds(thresholds),
+            thresholds=thresholds,
+            version=digest.hexdigest()[:16],
+            signature=signature
+        )
+
+    def changed_on_disk(self):
+        try:
+            signature = self._signature()
+        except OSError:
+            return False  # mid-replace; try again on the next check
+        return signature != self._seen_signature and signature != self._failed_signature
+
+    def reload(self):
+        """
+        Load the files and swap the snapshot in. Returns True if the model
+        version changed; files rewritten with the same content keep the
+        current snapshot (and its loaded_at). On error the current snapshot
+        stays in service.
+        """
+        with self._lock:
+            try:
+                snapshot = self._load()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                try:
+                    self._failed_signature = self._signature()
+                except OSError:
+                    pass
+                raise
+            self.last_error = None
+            self._seen_signature = snapshot.signature
+            if snapshot.version == self.current.version:
+                return False
+            self.current = snapshot
+            self.reloads += 1
+            return True
+
+    async def watch(self, interval):
+        """Poll the source files and reload when they change"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            if self.changed_on_disk():
+                try:
+                    if await loop.run_in_executor(None, self.reload):
+                        print(f"Model reloaded: version {self.current.version}")
+                except Exception as e:
+                    print(f"Model reload failed, keeping version {self.current.version}: {e}")
+
+    def info(self):
+        snapshot = self.current
+        return {
+            "model_version": snapshot.version,
+            "threshold": snapshot.thresholds['recommended_threshold'],
+            "loaded_at": snapshot.loaded_at,
+            "reloads": self.reloads,
+            "last_reload_error": self.last_error
+        }
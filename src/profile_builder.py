@@ -0,0 +1,213 @@
+"""
+Streaming human profile builder.
+Per-feature running mean/variance (Welford/Chan), min/max and t-digest
+quantile sketches in mergeable state, so the profile can be built from any
+number of clips in bounded memory, in parallel shards, and updated
+incrementally by adding shards.
+"""
+import os
+import json
+import numpy as np
+
+class QuantileSketch:
+    """
+    Merging t-digest. Exact (pandas 'linear' interpolation) while the number
+    of values is within `compression`; approximate, with tighter error at the
+    tails, beyond that.
+    """
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self._buffer = []
+
+    @property
+    def count(self):
+        return float(self.weights.sum()) + sum(len(b) for b in self._buffer)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._buffer.append(values)
+            if sum(len(b) for b in self._buffer) > 5 * self.compression:
+                self._compress()
+
+    def merge(self, other):
+        other._compress()
+        self._compress()
+        self.means = np.concatenate([self.means, other.means])
+        self.weights = np.concatenate([self.weights, other.weights])
+        self._compress(force=True)
+        return self
+
+    def _compress(self, force=False):
+        if not self._buffer and not force:
+            return
+        means = np.concatenate([self.means] + self._buffer)
+        weights = np.concatenate([self.weights] + [np.ones(len(b)) for b in self._buffer])
+        self._buffer = []
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        if total <= self.compression:
+            self.means, self.weights = means, weights
+            return
+
+        # Greedy merge of neighbours while the merged centroid spans at most
+        # one unit of the k1 scale function k(q) = delta / (2 pi) * asin(2q - 1)
+        def k_scale(q):
+            return self.compression / (2 * np.pi) * np.arcsin(2 * np.clip(q, 0, 1) - 1)
+
+        out_means, out_weights = [means[0]], [weights[0]]
+        cumulative = 0.0
+        k_left = k_scale(0.0)
+        for mean, weight in zip(means[1:], weights[1:]):
+            merged = out_weights[-1] + weight
+            if k_scale((cumulative + merged) / total) - k_left <= 1:
+                out_means[-1] += (mean - out_means[-1]) * weight / merged
+                out_weights[-1] = merged
+            else:
+                cumulative += out_weights[-1]
+                k_left = k_scale(cumulative / total)
+                out_means.append(mean)
+                out_weights.append(weight)
+        self.means, self.weights = np.array(out_means), np.array(out_weights)
+
+    def quantile(self, q):
+        self._compress()
+        if len(self.means) == 0:
+            return float('nan')
+        # Each centroid sits at the (0-based) rank of its middle value;
+        # interpolate linearly in rank like pandas does
+        ranks = np.cumsum(self.weights) - self.weights + (self.weights - 1) / 2
+        return float(np.interp(q * (self.weights.sum() - 1), ranks, self.means))
+
+    def to_dict(self):
+        self._compress()
+        return {"means": self.means.tolist(), "weights": self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, state, compression=200):
+        sketch = cls(compression)
+        sketch.means = np.array(state["means"], dtype=float)
+        sketch.weights = np.array(state["weights"], dtype=float)
+        return sketch
+
+class ProfileAccumulator:
+    def __init__(self, columns=None, compression=200):
+        """
+        Args:
+            columns: Feature names (taken from the first clip when omitted)
+            compression: t-digest size per feature
+        """
+        self.compression = compression
+        self.columns = None
+        if columns is not None:
+            self._init_columns(list(columns))
+
+    def _init_columns(self, columns):
+        n = len(columns)
+        self.columns = columns
+        self.count = np.zeros(n)
+        self.mean = np.zeros(n)
+        self.m2 = np.zeros(n)
+        self.min = np.full(n, np.inf)
+        self.max = np.full(n, -np.inf)
+        self.sketches = [QuantileSketch(self.compression) for _ in columns]
+
+    def update(self, flat_features):
+        """Add one clip's flattened features"""
+        if self.columns is None:
+            self._init_columns(list(flat_features.keys()))
+        self.update_matrix(np.array([[flat_features.get(c, np.nan) for c in self.columns]], dtype=float))
+
+    def update_matrix(self, matrix):
+        """Add a clips x features matrix in column order (NaN = missing)"""
+        matrix = np.asarray(matrix, dtype=float)
+        valid = ~np.isnan(matrix)
+        n_b = valid.sum(axis=0)
+        has = n_b > 0
+        filled = np.where(valid, matrix, 0.0)
+        mean_b = np.divide(filled.sum(axis=0), n_b, out=np.zeros_like(self.mean), where=has)
+        m2_b = np.sum(np.where(valid, matrix - mean_b, 0.0) ** 2, axis=0)
+        self._combine(n_b, mean_b, m2_b)
+        self.min = np.fmin(self.min, np.where(valid, matrix, np.inf).min(axis=0))
+        self.max = np.fmax(self.max, np.where(valid, matrix, -np.inf).max(axis=0))
+        for i, sketch in enumerate(self.sketches):
+            sketch.add(matrix[:, i])
+
+    def _combine(self, n_b, mean_b, m2_b):
+        # Chan et al. parallel variance update
+        n = self.count + n_b
+        safe_n = np.where(n > 0, n, 1)
+        delta = mean_b - self.mean
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.count * n_b / safe_n
+        self.mean = self.mean + delta * n_b / safe_n
+        self.count = n
+
+    def merge(self, other):
+        """Fold in another shard's accumulator (same feature layout)"""
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self._init_columns(other.columns)
+        elif other.columns != self.columns:
+            raise ValueError("Cannot merge profiles with different feature layouts")
+        self._combine(other.count, other.mean, other.m2)
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def profile(self):
+        """Profile in the human_feature_profile.json layout (std uses ddof=1, as pandas)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(self.count > 0, self.mean, np.nan)
+            std = np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+        stats = {
+            "mean": mean,
+            "std": std,
+            "min": np.where(self.count > 0, self.min, np.nan),
+            "max": np.where(self.count > 0, self.max, np.nan),
+            "q1": [sketch.quantile(0.25) for sketch in self.sketches],
+            "q3": [sketch.quantile(0.75) for sketch in self.sketches]
+        }
+        return {name: {c: float(v) for c, v in zip(self.columns, values)} for name, values in stats.items()}
+
+    def save(self, path):
+        state = {
+            "columns": self.columns,
+            "compression": self.compression,
+            "count": self.count.tolist(),
+            "mean": self.mean.tolist(),
+            "m2": self.m2.tolist(),
+            "min": self.min.tolist(),
+            "max": self.max.tolist(),
+            "sketches": [sketch.to_dict() for sketch in self.sketches]
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            state = json.load(f)
+        acc = cls(state["columns"], compression=state["compression"])
+        for key in ("count", "mean", "m2", "min", "max"):
+            setattr(acc, key, np.array(state[key], dtype=float))
+        acc.sketches = [QuantileSketch.from_dict(s, state["compression"]) for s in state["sketches"]]
+        return acc
+
+def build_profile(shard_dir):
+    """Merge every saved shard state in shard_dir into one profile dict"""
+    merged = ProfileAccumulator()
+    for name in sorted(os.listdir(shard_dir)):
+        if name.endswith(".json"):
+            merged.merge(ProfileAccumulator.load(os.path.join(shard_dir, name)))
+    if merged.columns is None:
+        return None
+    return merged.profile()
@@ -0,0 +1,93 @@
+"""
+Content-addressed LRU/TTL cache of detection results.
+Keys are a digest of the submitted audio bytes plus the model version, so a
+re-submitted clip skips decoding and feature extraction entirely.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+import numpy as np
+
+# Rough per-entry cost of the key, response dict and bookkeeping
+ENTRY_OVERHEAD_BYTES = 512
+
+class ResultCache:
+    def __init__(self, max_entries=4096, ttl_seconds=3600):
+        """
+        Args:
+            max_entries: LRU capacity (0 disables the cache)
+            ttl_seconds: Entry lifetime; expired entries count as misses
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Only touched from the event loop thread, so no locking is needed
+
+    @staticmethod
+    def hasher():
+        """Incremental hasher for callers that see the audio in chunks"""
+        return hashlib.blake2b(digest_size=20)
+
+    @staticmethod
+    def make_key(digest, version):
+        return f"{version}:{digest}"
+
+    @classmethod
+    def key_for(cls, audio_bytes, version):
+        h = cls.hasher()
+        h.update(audio_bytes)
+        return cls.make_key(h.hexdigest(), version)
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, key):
+        """Return the cached {"features", "response"} entry, or None"""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry["expires_at"] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, features, response):
+        """
+        Args:
+            features: Flattened feature vector in profile order
+            response: Public detection response for the clip
+        """
+        if not self.enabled:
+            return
+        self._entries[key] = {
+            "features": np.asarray(features, dtype=np.float32),
+            "response": dict(response),
+            "expires_at": time.monotonic() + self.ttl_seconds
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "approx_bytes": sum(entry["features"].nbytes + ENTRY_OVERHEAD_BYTES for entry in self._entries.values())
+        }
@@ -0,0 +1,83 @@
+"""
+Shared SNR estimate for corpus preparation and inference.
+Noise power is the mean energy of the quietest frames, found with a partial
+selection (np.partition) rather than a full sort. Also holds the other
+frame-energy measures used before feature extraction (activity, segment
+selection for the analysis budget).
+"""
+import librosa
+import numpy as np
+
+NOISE_FRACTION = 0.1
+# Reported when the quietest frames are digital silence
+SNR_CEILING_DB = 50.0
+# Frames within this many dB of the loudest frame count as active speech
+VOICED_RANGE_DB = 30.0
+
+def frame_energy(y, frame_length=2048, hop_length=512):
+    """Mean-square energy per frame (same framing as ClipAnalysis.frame_energy)"""
+    return librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0] ** 2
+
+def estimate_snr(frame_energy, noise_fraction=NOISE_FRACTION):
+    """
+    SNR in dB: mean frame energy over the mean energy of the quietest
+    `noise_fraction` of frames. O(n) in the number of frames.
+    """
+    energy = np.asarray(frame_energy, dtype=float).ravel()
+    if len(energy) == 0:
+        return 0.0
+    k = max(1, int(len(energy) * noise_fraction))
+    noise_power = np.mean(np.partition(energy, k - 1)[:k])
+    if noise_power <= 0:
+        return SNR_CEILING_DB
+    return float(10 * np.log10(np.mean(energy) / noise_power))
+
+def voiced_ratio(frame_energy, range_db=VOICED_RANGE_DB):
+    """Fraction of frames within `range_db` of the loudest frame (energy-based activity estimate)"""
+    energy = np.asarray(frame_energy, dtype=float).ravel()
+    if len(energy) == 0 or energy.max() <= 0:
+        return 0.0
+    return float(np.mean(energy >= energy.max() * 10 ** (-range_db / 10)))
+
+def select_segments(frame_energy, hop_length, budget_samples, segment_samples, n_samples, range_db=VOICED_RANGE_DB):
+    """
+    Pick segments of about `segment_samples` (never longer than the budget)
+    totalling `budget_samples`, or the whole clip if it is shorter: mostly
+    active segments (over half their frames within `range_db` of the loudest
+    frame) first, loudest first, with the last pick cut to fill the budget.
+
+    Returns (start, end) sample ranges in time order, adjacent picks joined.
+    """
+    energy = np.asarray(frame_energy, dtype=float).ravel()
+    budget_samples = min(budget_samples, n_samples)
+    frames_per_segment = max(1, min(segment_samples, budget_samples) // hop_length)
+    segment_length = frames_per_segment * hop_length
+    n_segments = min(len(energy) // frames_per_segment, n_samples // segment_length)
+
+    # Candidate segments in rank order, then the audio after the last whole segment
+    candidates = []
+    if n_segments:
+        segments = energy[:n_segments * frames_per_segment].reshape(n_segments, frames_per_segment)
+        active = segments >= energy.max() * 10 ** (-range_db / 10)
+        mostly_active = active.mean(axis=1) > 0.5
+        order = np.lexsort((-segments.mean(axis=1), ~mostly_active))
+        candidates = [(int(i) * segment_length, (int(i) + 1) * segment_length) for i in order]
+    if n_segments * segment_length < n_samples:
+        candidates.append((n_segments * segment_length, n_samples))
+
+    picked = []
+    remaining = budget_samples
+    for start, end in candidates:
+        if remaining <= 0:
+            break
+        end = min(end, start + remaining)
+        picked.append((start, end))
+        remaining -= end - start
+
+    ranges = []
+    for start, end in sorted(picked):
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(1, os.path.join(ROOT, "src"))
+
+# Keep app startup fast and quiet under test
+os.environ.setdefault("WARMUP", "0")
+os.environ.setdefault("MODEL_RELOAD_INTERVAL", "0")
+
+@pytest.fixture(scope="session")
+def api_module():
+    import api
+    return api
+
+@pytest.fixture
+def client(api_module):
+    from fastapi.testclient import TestClient
+    with TestClient(api_module.app) as test_client:
+        yield test_client
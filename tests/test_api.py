@@ -0,0 +1,107 @@
+import base64
+import threading
+
+import pytest
+
+from benchmark import synthetic_speech, wav_bytes
+
+def detect(client, api, audio_bytes):
+    return client.post(
+        "/detect",
+        json={"language": "en", "audio_format": "wav", "audio_base64_format": base64.b64encode(audio_bytes).decode()},
+        headers={"x-api-key": api.API_KEY}
+    )
+
+def test_triage_matches_full_analysis_for_uncertain_short_clip(client, api_module, monkeypatch):
+    # Full analysis finds this clip outside the human range: UNCERTAIN, reported as HUMAN 0.5
+    audio = wav_bytes(synthetic_speech(1.0, seed=11))
+
+    early_exits = ("voice_detect_early_exits_total", ())
+    before = api_module.metrics._counters.get(early_exits, 0)
+    responses = {}
+    for triage in (False, True):
+        monkeypatch.setattr(api_module, "TRIAGE", triage)
+        api_module.result_cache.clear()
+        response = detect(client, api_module, audio)
+        assert response.status_code == 200
+        responses[triage] = response.json()
+
+    assert responses[False] == {"classification": "HUMAN", "confidence": 0.5}
+    assert responses[True] == responses[False]
+    # The triaged request really skipped feature extraction
+    assert api_module.metrics._counters.get(early_exits, 0) == before + 1
+
+def test_triage_differs_from_full_analysis_inside_the_human_range(api_module):
+    engine = api_module.registry.current.engine
+    reliability = 0.5  # a short, noisy clip
+    # Full analysis of a clip at 80% of the human threshold: HUMAN with low confidence
+    decisions = engine.decide_batch([0.8 * engine.human_threshold], [reliability], [[0.0, 0.0, 0.0]])
+    full = api_module.map_to_minimal_response({
+        "result": str(decisions["result"][0]), "confidence": float(decisions["confidence"][0])
+    })
+    triaged = api_module.map_to_minimal_response(engine.triage(reliability))
+
+    # Same classification; triage reports the uncertain verdict's confidence instead
+    assert full == {"classification": "HUMAN", "confidence": 0.25}
+    assert triaged == {"classification": "HUMAN", "confidence": 0.5}
+
+def test_triage_uses_settings_passed_from_the_request(api_module):
+    y, sr = synthetic_speech(1.0, seed=11), 16000
+    # A worker decides only from the settings it is given, not its own registry
+    assert "triaged" not in api_module.analyze_waveform(y, sr)
+    clip = api_module.analyze_waveform(y, sr, triage=("v-parent", 1.1))
+    assert clip["triaged"] and clip["model_version"] == "v-parent"
+
+@pytest.mark.parametrize("body", [b"", b"not audio at all", b"RIFF\x00\x00\x00\x00WAVE"])
+def test_undecodable_audio_is_rejected_with_400(client, api_module, body):
+    response = detect(client, api_module, body)
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Unsupported or corrupt audio")
+
+    response = client.post("/detect/stream", content=body, headers={"x-api-key": api_module.API_KEY})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Unsupported or corrupt audio")
+
+def test_stream_maps_truncated_audio_to_400(client, api_module, monkeypatch):
+    def truncated(*args):
+        raise EOFError
+    monkeypatch.setattr(api_module, "decode_audio_stream", truncated)
+    response = client.post("/detect/stream", content=wav_bytes(synthetic_speech(1.0, seed=3)),
+                           headers={"x-api-key": api_module.API_KEY})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unsupported or corrupt audio (EOFError)"
+
+def test_live_session_sends_a_verdict_per_hop_of_a_long_message(client, api_module):
+    pcm = (synthetic_speech(3.0, seed=5) * 32767).astype("<i2").tobytes()
+    with client.websocket_connect(f"/ws/detect?window=2&hop=1&api_key={api_module.API_KEY}") as ws:
+        # One long message, then the rest split mid-sample
+        ws.send_bytes(pcm[:3 * 16000 * 2 - 3])
+        ws.send_bytes(pcm[3 * 16000 * 2 - 3:])
+        verdicts = [ws.receive_json() for _ in range(3)]
+        ws.send_text("end")
+    assert [(v["type"], v["window_start"], v["window_end"]) for v in verdicts] == [
+        ("verdict", 0.0, 1.0), ("verdict", 0.0, 2.0), ("verdict", 1.0, 3.0)
+    ]
+
+def test_stream_upload_is_admitted_before_its_body_is_read(client, api_module):
+    audio = wav_bytes(synthetic_speech(1.0, seed=7))
+    with api_module.pool.reserve(api_module.pool.capacity):
+        response = client.post("/detect/stream", content=audio, headers={"x-api-key": api_module.API_KEY})
+    assert response.status_code == 503
+    assert api_module.pool.in_flight == 0
+
+def test_stream_decodes_inside_its_pool_slot(client, api_module, monkeypatch):
+    seen = {}
+    decode = api_module.decode_audio_stream
+    def recording_decode(*args):
+        seen["thread"] = threading.current_thread().name
+        seen["in_flight"] = api_module.pool.in_flight
+        return decode(*args)
+    monkeypatch.setattr(api_module, "decode_audio_stream", recording_decode)
+    api_module.result_cache.clear()
+
+    response = client.post("/detect/stream", content=wav_bytes(synthetic_speech(1.0, seed=7)),
+                           headers={"x-api-key": api_module.API_KEY})
+    assert response.status_code == 200
+    assert seen["in_flight"] == 1
+    assert seen["thread"].startswith("inference")
@@ -0,0 +1,26 @@
+import json
+import logging
+import time
+
+from audit_log import BatchingRotatingFileHandler, JsonLinesFormatter
+
+
+def test_single_record_is_flushed_within_the_interval(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    handler = BatchingRotatingFileHandler(str(path), max_bytes=1024 * 1024, backup_count=1,
+                                          batch_size=64, flush_interval=0.2)
+    handler.setFormatter(JsonLinesFormatter())
+    logger = logging.getLogger("audit.test_flush")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.info("detect", extra={"audit": {"request_id": "r1"}})
+        deadline = time.monotonic() + 1.0
+        while not path.read_text(encoding="utf-8") and time.monotonic() < deadline:
+            time.sleep(0.02)
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["request_id"] for line in lines] == ["r1"]
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
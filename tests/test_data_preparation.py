@@ -0,0 +1,57 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import soundfile as sf
+
+from data_preparation import PreparationCheckpoint, prepare_dataset
+
+
+def test_failed_items_are_retried_on_the_next_run(tmp_path):
+    lang_dir = tmp_path / "source" / "Telugu"
+    lang_dir.mkdir(parents=True)
+    t = np.arange(16000) / 16000
+    sf.write(lang_dir / "a_ok.wav", 0.5 * np.sin(2 * np.pi * 220 * t), 16000)
+    sf.write(lang_dir / "b_short.wav", 0.5 * np.sin(2 * np.pi * 220 * t[:1600]), 16000)
+    (lang_dir / "c_broken.wav").write_bytes(b"not audio")
+    output_dir = tmp_path / "processed"
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        meta = prepare_dataset("Telugu", None, str(output_dir), executor, limit=10, local_dir=str(tmp_path / "source"))
+
+    assert [record["id"] for record in meta] == ["Telugu_000000"]
+    checkpoint = PreparationCheckpoint(os.path.join(output_dir, "Telugu", "checkpoint.json"))
+    # The filtered short clip is done; the undecodable one is left to retry
+    assert checkpoint.done == {0, 1}
+
+def test_in_flight_items_are_capped(tmp_path, monkeypatch):
+    lang_dir = tmp_path / "source" / "Telugu"
+    lang_dir.mkdir(parents=True)
+    t = np.arange(16000) / 16000
+    for i in range(12):
+        sf.write(lang_dir / f"{i:02d}.wav", 0.5 * np.sin(2 * np.pi * (200 + i) * t), 16000)
+
+    class CountingExecutor(ThreadPoolExecutor):
+        def __init__(self):
+            super().__init__(max_workers=2)
+            self.in_flight = self.peak = 0
+            self.lock = threading.Lock()
+
+        def submit(self, fn, *args, **kwargs):
+            with self.lock:
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+            future = super().submit(fn, *args, **kwargs)
+            future.add_done_callback(self.finished)
+            return future
+
+        def finished(self, _future):
+            with self.lock:
+                self.in_flight -= 1
+
+    with CountingExecutor() as executor:
+        meta = prepare_dataset("Telugu", None, str(tmp_path / "processed"), executor, limit=12,
+                               local_dir=str(tmp_path / "source"), max_pending=3)
+    assert len(meta) == 12
+    assert executor.peak <= 3
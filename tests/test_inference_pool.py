@@ -0,0 +1,59 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from src.inference_pool import InferencePool, PoolSaturated, _noop
+
+def slow_initializer():
+    # Workers finish warming up at different times
+    time.sleep(0.2 + 0.3 * (os.getpid() % 3))
+    with open(os.path.join(os.environ["POOL_TEST_DIR"], str(os.getpid())), "w") as f:
+        f.write(str(time.time()))
+
+def test_start_workers_waits_for_every_initializer(tmp_path, monkeypatch):
+    monkeypatch.setenv("POOL_TEST_DIR", str(tmp_path))
+    pool = InferencePool(workers=3, queue_size=0, mode="process", initializer=slow_initializer)
+    try:
+        asyncio.run(pool.start_workers())
+        ready_at = time.time()
+        finished = [float(p.read_text()) for p in tmp_path.iterdir()]
+        assert len(finished) == 3
+        assert max(finished) <= ready_at
+    finally:
+        pool.shutdown()
+
+def test_cancelled_request_keeps_its_slot_until_the_job_ends():
+    pool = InferencePool(workers=1, queue_size=0, mode="thread")
+    job_started, finish = threading.Event(), threading.Event()
+
+    def job():
+        job_started.set()
+        finish.wait(5)
+
+    async def scenario():
+        task = asyncio.create_task(pool.run(job))
+        await asyncio.get_running_loop().run_in_executor(None, job_started.wait, 5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        # The job is still running on the worker, so the pool is still full
+        assert pool.in_flight == 1
+        with pytest.raises(PoolSaturated):
+            await pool.run(_noop)
+
+        finish.set()
+        for _ in range(100):
+            if pool.in_flight == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.in_flight == 0
+        assert await pool.run(_noop) is None
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        finish.set()
+        pool.shutdown()
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from feature_engineering import FeatureExtractor
+from live_scoring import LiveSession, decode_pcm
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return FeatureExtractor(sr=16000)
+
+
+@pytest.mark.parametrize("encoding, dtype", [("pcm_s16le", "<i2"), ("f32le", "<f4")])
+def test_decode_reassembles_samples_split_across_messages(extractor, encoding, dtype):
+    session = LiveSession(extractor, window_seconds=2.0, hop_seconds=1.0, encoding=encoding)
+    payload = (np.arange(100) * 100).astype(dtype).tobytes()
+    parts = [session.decode(payload[start:start + 5]) for start in range(0, len(payload), 5)]
+    np.testing.assert_array_equal(np.concatenate(parts), decode_pcm(payload, encoding))
+
+
+def test_long_message_is_analyzed_in_full(extractor):
+    session = LiveSession(extractor, window_seconds=2.0, hop_seconds=1.0)
+    rng = np.random.default_rng(0)
+    session.feed(0.1 * rng.standard_normal(3 * 16000).astype(np.float32))
+
+    hops = 0
+    while (hop := session.pop_hop()) is not None:
+        session.advance(hop)
+        hops += 1
+    assert hops == 3
+    assert session.samples_dropped == 0
+    assert (session.window_start, session.window_end) == (1.0, 3.0)
+
+
+def test_backlog_past_one_window_is_dropped_on_the_timeline(extractor):
+    session = LiveSession(extractor, window_seconds=2.0, hop_seconds=1.0)
+    rng = np.random.default_rng(0)
+    session.feed(0.1 * rng.standard_normal(3 * 16000).astype(np.float32))
+
+    # No worker free: the queue is cut to one window, oldest audio first
+    assert session.unpop_hop(session.pop_hop()) == 16000
+    assert session.samples_dropped == 16000
+    session.advance(session.pop_hop())
+    assert (session.window_start, session.window_end) == (1.0, 2.0)
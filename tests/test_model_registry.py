@@ -0,0 +1,41 @@
+import os
+import shutil
+
+from model_registry import ModelRegistry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_registry(tmp_path):
+    paths = []
+    for name in ("human_feature_profile.json", "human_anomaly_thresholds.json"):
+        path = tmp_path / name
+        shutil.copy(os.path.join(ROOT, "reports", name), path)
+        paths.append(str(path))
+    return ModelRegistry(*paths), paths
+
+
+def test_reload_keeps_snapshot_when_content_is_unchanged(tmp_path):
+    registry, (profile_path, _) = make_registry(tmp_path)
+    snapshot = registry.current
+
+    # Same bytes, new mtime: a redeploy of the same calibration
+    st = os.stat(profile_path)
+    os.utime(profile_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert registry.changed_on_disk()
+    assert registry.reload() is False
+    assert registry.current is snapshot
+    assert registry.info()["loaded_at"] == snapshot.loaded_at
+    assert registry.reloads == 0
+    assert not registry.changed_on_disk()
+
+
+def test_reload_swaps_snapshot_when_content_changes(tmp_path):
+    registry, (_, thresholds_path) = make_registry(tmp_path)
+    version = registry.current.version
+
+    with open(thresholds_path, "a") as f:
+        f.write("\n")
+    assert registry.reload() is True
+    assert registry.current.version != version
+    assert registry.reloads == 1
@@ -0,0 +1,25 @@
+import pytest
+
+from benchmark import synthetic_speech
+from src.signal_quality import frame_energy, select_segments
+
+SR = 16000
+HOP = 512
+
+@pytest.mark.parametrize("budget_seconds", [0.01, 0.5, 1.0, 3.0, 5.0, 11.5])
+def test_selected_length_fills_the_budget(budget_seconds):
+    y = synthetic_speech(12, seed=4)
+    budget = int(budget_seconds * SR)
+    ranges = select_segments(frame_energy(y, 2048, HOP), HOP, budget, 2 * SR, len(y))
+
+    total = sum(end - start for start, end in ranges)
+    assert total <= budget
+    assert total >= budget - HOP
+    assert all(0 <= start < end <= len(y) for start, end in ranges)
+    # Sorted and non-overlapping
+    assert all(prev_end <= start for (_, prev_end), (start, _) in zip(ranges, ranges[1:]))
+
+def test_clip_shorter_than_a_segment():
+    y = synthetic_speech(1, seed=5)
+    ranges = select_segments(frame_energy(y, 2048, HOP), HOP, 5 * SR, 2 * SR, len(y))
+    assert ranges == [(0, len(y))]